@@ -0,0 +1,132 @@
+# batch_runner.py
+import argparse, os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from browser import DriverPool
+from csv_handler import CSVHandler
+from search_scraper import SearchScraper
+
+
+def read_hashtags(tags=None, tags_file=None):
+    """Hashtags from the command line and/or a file (one per line, '#' is optional), without duplicates."""
+    out = list(tags or [])
+    if tags_file:
+        with open(tags_file, "r", encoding="utf-8") as f:
+            out += [line.strip() for line in f if line.strip()]
+    seen, result = set(), []
+    for t in out:
+        t = t.lstrip("#")
+        if t.lower() not in seen:
+            seen.add(t.lower())
+            result.append(t)
+    return result
+
+
+def _scrape_tag(pool, tag, limit, out_csv, retries):
+    # Scrape one hashtag with a warm browser from the pool, retry if it fails.
+    # With out_csv the rows go to that file, else they are returned.
+    for attempt in range(retries + 1):
+        try:
+            with pool.driver() as driver:
+                search = SearchScraper(driver)
+                if out_csv is None:
+                    return search.search_hashtag(tag, limit=limit)
+                # a retry keeps the rows of the failed try (resume)
+                with CSVHandler.open_stream(out_csv, resume=attempt > 0) as sink:
+                    search.search_hashtag(tag, limit=limit, sink=sink, max_id=sink.resume_max_id)
+                return sink.count
+        except Exception as e:
+            print(f"[WARN] #{tag} failed (try {attempt + 1}/{retries + 1}):", e)
+    raise RuntimeError(f"#{tag} failed after {retries + 1} tries")
+
+
+def run_batch(hashtags, workers=2, limit=None, out_dir="out", combined=None, headless=True,
+              retries=2, cookies_path="twitter_cookies.json", lean=True):
+    """Scrape many hashtags on a pool of logged-in browsers.
+
+    Every tag goes to `<out_dir>/<tag>.csv`, or all tags go to one `combined` CSV
+    (deduplicated by tweet_id). Returns the list of tags that failed.
+    """
+    if combined is None:
+        os.makedirs(out_dir, exist_ok=True)
+    failed = []
+
+    with DriverPool(workers, headless, cookies_path, lean) as pool, ThreadPoolExecutor(workers) as ex:
+        futures = {
+            ex.submit(_scrape_tag, pool, tag, limit,
+                      None if combined else os.path.join(out_dir, f"{tag}.csv"), retries): tag
+            for tag in hashtags
+        }
+        sink = CSVHandler.open_stream(combined) if combined else None
+        try:
+            for fut in as_completed(futures):
+                tag = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    print("[ERR]", e)
+                    failed.append(tag)
+                    continue
+                if sink is None:
+                    print(f"[OK] #{tag}: {result} rows")
+                    continue
+                # one file for all tags: write here (one thread), skip tweets seen in another tag
+                new = 0
+                for d in result:
+                    if d["tweet_id"] not in sink.seen_ids:
+                        sink.write(d)
+                        new += 1
+                print(f"[OK] #{tag}: {len(result)} rows ({new} new)")
+        finally:
+            if sink is not None:
+                sink.close()
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scrape many hashtags with a pool of logged-in browsers."
+    )
+    parser.add_argument("hashtags", nargs="*", help="Hashtags to scrape (without the #)")
+    parser.add_argument("-f", "--file", help="File with one hashtag per line")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=2,
+        help="Number of browsers in the pool (default: 2)"
+    )
+    parser.add_argument(
+        "-l", "--limit", type=int, default=None,
+        help="Limit number of tweets per hashtag (default: scrape all available)"
+    )
+    parser.add_argument(
+        "-d", "--out-dir", default="out",
+        help="Folder for one CSV per hashtag (default: out)"
+    )
+    parser.add_argument(
+        "-c", "--combined", default=None,
+        help="Save all hashtags into this one CSV instead of one file per hashtag"
+    )
+    parser.add_argument(
+        "-r", "--retries", type=int, default=2,
+        help="How many times a failed hashtag is tried again (default: 2)"
+    )
+    parser.add_argument(
+        "--show", action="store_true",
+        help="Show the browser windows (default: headless)"
+    )
+    parser.add_argument(
+        "--keep-media", action="store_true",
+        help="Load images, videos and fonts (default: blocked, we only need their URLs)"
+    )
+
+    args = parser.parse_args()
+    tags = read_hashtags(args.hashtags, args.file)
+    if not tags:
+        parser.error("give at least one hashtag or --file")
+    failed = run_batch(tags, args.workers, args.limit, args.out_dir, args.combined,
+                       headless=not args.show, retries=args.retries, lean=not args.keep_media)
+    if failed:
+        print("[ERR] Failed hashtags:", ", ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
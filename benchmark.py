@@ -0,0 +1,487 @@
+# benchmark.py
+"""Offline benchmarks for the scrape and parse hot paths.
+
+Browser part: a local server gives synthetic X-like search and profile pages,
+and SearchScraper / ProfileScraper run on them in headless Chrome.
+Startup part: how long `main.py --help` and the offline `main.py stats` take in a new
+Python process, and that they never import Selenium.
+Micro part: parse_int_maybe / parse_counts (repeated and all-different texts),
+CSVHandler.save_to_csv and OriginatorFinder.find_originator on 10k / 100k / 1M synthetic rows.
+
+    python benchmark.py                    # run all, compare with bench_baseline.json
+    python benchmark.py --save-baseline    # run all, save the results as the new baseline
+    python benchmark.py --skip-browser --sizes 10000 100000
+    python benchmark.py --sessions 3       # also: SessionPool on a server that rate-limits
+"""
+import argparse, csv, json, os, random, resource, statistics, subprocess, sys, tempfile, threading, time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+BASELINE = "bench_baseline.json"
+TOLERANCE = 0.20  # more than 20% worse than the baseline is a regression
+
+# "higher is better" metrics, all the others are times/sizes (lower is better)
+HIGHER_IS_BETTER = ("cards_per_sec", "rows_per_sec")
+
+# The first cards come with the page, the next ones are fetched from /more while
+# scrolling (like X's API), so the page also works without JavaScript (tests).
+PAGE = """<!doctype html><html lang="en"><head><style>article {{ height: 120px; }}</style></head>
+<body><div id="timeline">{cards}</div><script>
+const LAST = {last}, STEP = 20;
+let next = {next}, loading = false;
+function more() {{
+  if (loading || next >= LAST) return;
+  loading = true;
+  const end = Math.min(LAST, next + STEP);
+  fetch('/more?start=' + next + '&end=' + end).then(r => r.text()).then(html => {{
+    document.getElementById('timeline').insertAdjacentHTML('beforeend', html);
+    next = end;
+    loading = false;
+  }});
+}}
+window.addEventListener('scroll', () => {{
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) setTimeout(more, 50);
+}});
+</script></body></html>"""
+
+EMPTY = """<!doctype html><html lang="en"><body>
+<div data-testid="emptyState">No results for this search</div></body></html>"""
+
+CARD = """<article data-testid="tweet">
+  <div data-testid="User-Name"><a href="/user{u}">User {u}</a></div>
+  <a href="/user{u}/status/{id}"><time datetime="{t}">t</time></a>
+  <div data-testid="tweetText">Tweet number {i} #bench #tag{tag}</div>
+  <button data-testid="reply">{reply}</button>
+  <button data-testid="retweet">{retweet}</button>
+  <button data-testid="like">{like}K</button>
+</article>"""
+
+# card i (0 = newest) is posted at START + (total - i) * spacing seconds
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+PROFILE = """<!doctype html><html lang="en"><body>
+<div data-testid="UserName"><span>Bench User</span><span>@{handle}</span></div>
+<div data-testid="UserDescription">Synthetic profile, mail bench@example.com</div>
+<div data-testid="UserProfileHeader_Items"><span>Lahore</span><span>Joined March 2010</span></div>
+<a data-testid="UserUrl" href="https://example.com">example.com</a>
+<div data-testid="UserStats"><a aria-label="1,234 Following">1,234 Following</a>
+<a aria-label="5.6K Followers">5.6K Followers</a></div>
+<a role="tab" aria-label="12.3K posts"><span>Posts</span></a>
+<a role="tab" aria-label="321 media"><span>Media</span></a>
+<script>window.__state = {{"rest_id":"424242"}};</script>
+</body></html>"""
+
+
+RATE_LIMITED = """<!doctype html><html lang="en"><body>
+<div>Rate limit exceeded. Something went wrong. Try reloading.</div></body></html>"""
+
+
+def card_time(i, total, spacing):
+    return START + timedelta(seconds=(total - i) * spacing)
+
+
+def card_id(i, total):
+    # IDs grow with time like X's, so the newest card has the biggest ID
+    return 1_000_000 + total - i
+
+
+def render_cards(start, end, total, spacing):
+    return "".join(
+        CARD.format(i=i, u=i % 50, id=card_id(i, total), tag=i % 7, reply=i % 13, retweet=i % 100,
+                    like=(i % 30) / 10,
+                    t=card_time(i, total, spacing).strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+        for i in range(start, end)
+    )
+
+
+def window_cards(query, total, spacing):
+    # [first, last) of the cards that match the since:/until:/max_id: operators of the query
+    since = until = max_id = None
+    for word in query.split():
+        key, _, value = word.partition(":")
+        if key == "since":
+            since = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+        elif key == "until":
+            until = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+        elif key == "max_id":
+            max_id = int(value)
+    match = [i for i in range(total)
+             if (since is None or card_time(i, total, spacing) >= since)
+             and (until is None or card_time(i, total, spacing) < until)
+             and (max_id is None or card_id(i, total) <= max_id)]
+    return (match[0], match[-1] + 1) if match else (0, 0)
+
+
+def make_handler(cards, throttle=None, spacing=60):
+    # A stand-in for X's live search: it answers since:/until:/max_id: like X, with
+    # `cards` tweets posted every `spacing` seconds from START.
+    # throttle=(n, seconds): at most n search pages every `seconds`, then a rate-limit page (HTTP 429)
+    loads, lock = [], threading.Lock()
+    state = {"total": cards}  # cards of the last search page (for /more)
+
+    def limited():
+        if throttle is None:
+            return False
+        n, seconds = throttle
+        with lock:
+            now = time.monotonic()
+            loads[:] = [t for t in loads if now - t < seconds]
+            if len(loads) >= n:
+                return True
+            loads.append(now)
+            return False
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, body):
+            data = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            qs = parse_qs(url.query)
+            if url.path == "/search" and limited():
+                return self._send(429, RATE_LIMITED)
+            if url.path == "/search":
+                # ?cards=N overrides the number of cards of this page
+                total = state["total"] = int(qs.get("cards", [cards])[0])
+                first, last = window_cards(qs.get("q", [""])[0], total, spacing)
+                if first == last:
+                    return self._send(200, EMPTY)
+                shown = min(last, first + 20)
+                return self._send(200, PAGE.format(cards=render_cards(first, shown, total, spacing),
+                                                   next=shown, last=last))
+            if url.path == "/more":
+                start, end = int(qs["start"][0]), int(qs["end"][0])
+                return self._send(200, render_cards(start, end, state["total"], spacing))
+            self._send(200, PROFILE.format(handle=url.path.strip("/") or "bench"))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(cards, throttle=None, spacing=60):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(cards, throttle, spacing))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class TreeMemory:
+    """Peak memory (MB) of this process and all its descendants, sampled in a thread.
+
+    chromedriver starts Chrome, and Chrome starts its renderer and GPU processes, so
+    the browser memory is in grandchildren that RUSAGE_CHILDREN never sees (it only
+    counts finished children that were waited for). With psutil the whole process
+    tree is summed every `every` seconds; without it only chromedriver is counted
+    (key "peak_rss_chromedriver_mb", not the browser).
+    """
+
+    def __init__(self, every=0.2):
+        self.every = every
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self.used = False  # only measured around the browser benchmarks
+        try:
+            import psutil
+            self._me = psutil.Process()
+        except ImportError:
+            self._me = None
+
+    def _sample(self):
+        total = 0
+        for p in [self._me] + self._me.children(recursive=True):
+            try:
+                total += p.memory_info().rss
+            except Exception:
+                pass  # the process ended between listing and reading it
+        self.peak = max(self.peak, total / 2**20)
+
+    def _run(self):
+        while not self._stop.wait(self.every):
+            self._sample()
+
+    def __enter__(self):
+        self.used = True
+        if self._me is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+
+    def results(self):
+        # this Python process (ru_maxrss), and the browser: whole tree or chromedriver only
+        # (macOS gives bytes instead of KB)
+        div = 1024 * 1024 if sys.platform == "darwin" else 1024
+        out = {"peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / div, 1)}
+        if self.used and self._me is not None:
+            out["peak_rss_tree_mb"] = round(self.peak, 1)
+        elif self.used:
+            out["peak_rss_chromedriver_mb"] = round(
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / div, 1)
+        return out
+
+
+def bench_browser(cards, profiles):
+    from browser import make_driver
+    from search_scraper import SearchScraper
+    from profile_scraper import ProfileScraper
+
+    server, base = start_server(cards)
+    driver = make_driver(headless=True)
+    results = {}
+    try:
+        search = SearchScraper(driver, base_url=base)
+        start = time.perf_counter()
+        tweets = search.search_hashtag("bench", limit=cards)
+        took = time.perf_counter() - start
+        results["search.cards"] = len(tweets)
+        results["search.seconds"] = round(took, 3)
+        results["search.cards_per_sec"] = round(len(tweets) / took, 1) if took else 0.0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            scraper = ProfileScraper(driver, csv_file=os.path.join(tmp, "profiles.csv"))
+            times = []
+            for i in range(profiles):
+                start = time.perf_counter()
+                scraper.scrape_profile(f"{base}/user{i}", save=False)
+                times.append(time.perf_counter() - start)
+        times.sort()
+        results["profile.mean_seconds"] = round(sum(times) / len(times), 3)
+        results["profile.p90_seconds"] = round(times[int(0.9 * (len(times) - 1))], 3)
+    finally:
+        driver.quit()
+        server.shutdown()
+    return results
+
+
+def bench_sessions(cards, sessions, throttle=(3, 10)):
+    # SessionScheduler on a server that rate-limits search pages: every window must
+    # still be scraped (by another session, or after a cooldown), nothing missed
+    from datetime import date
+    from session_pool import SessionPool, SessionScheduler
+
+    # the cards are spread over the 8 days, so every window has its own tweets
+    server, base = start_server(cards, throttle, spacing=8 * 24 * 3600 / (cards + 1))
+    results = {}
+    try:
+        with SessionPool([None] * sessions, per_minute=600, burst=10, cooldown=3, max_cooldown=20) as pool:
+            scheduler = SessionScheduler(pool, base_url=base)
+            start = time.perf_counter()
+            tweets = scheduler.scrape("bench", date(2024, 1, 1), date(2024, 1, 9), shards=sessions * 3)
+            took = time.perf_counter() - start
+            stats = pool.stats()
+        results["sessions.cards"] = len(tweets)
+        results["sessions.seconds"] = round(took, 3)
+        results["sessions.rate_limits"] = sum(s["rate_limits"] for s in stats)
+        results["sessions.missed_windows"] = len(scheduler.missed)
+    finally:
+        server.shutdown()
+    return results
+
+
+def synthetic_rows(n):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rnd = random.Random(n)
+    rows = []
+    for i in range(n):
+        when = start + timedelta(seconds=rnd.randrange(0, 365 * 86400))
+        rows.append({
+            "tweet_url": f"https://x.com/user{i % 500}/status/{10**17 + i}",
+            "tweet_id": str(10**17 + i),
+            "user_handle": f"user{i % 500}",
+            "profile_url": f"https://x.com/user{i % 500}",
+            "content": f"Synthetic tweet {i} #bench",
+            "hashtags": "#bench",
+            "post_time": when.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "scrape_time": "2024-12-31T00:00:00+0000",
+            "likes": rnd.randrange(0, 5000),
+            "comments": rnd.randrange(0, 300),
+            "reposts": rnd.randrange(0, 800),
+            "views": None,
+        })
+    return rows
+
+
+def best_of(fn, repeat=5):
+    # fastest of a few runs: a single run of a few milliseconds is mostly noise
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_micro(sizes):
+    from records import parse_counts
+    from utils import parse_int_maybe
+    from csv_handler import CSVHandler
+    from originator_finder import OriginatorFinder
+
+    results = {}
+    samples = ["12", "1,234", "1.2K", "3.4M", "2B", "", "987,654", "5.6k"]
+    for n in sizes:
+        texts = [samples[i % len(samples)] for i in range(n)]
+        took = best_of(lambda: [parse_int_maybe(t) for t in texts])
+        results[f"parse_int_maybe.{n}.seconds"] = round(took, 4)
+        results[f"parse_int_maybe.{n}.rows_per_sec"] = round(n / took, 1)
+
+        # the same texts as one column (vectorized)
+        took = best_of(lambda: parse_counts(texts))
+        results[f"parse_counts.{n}.seconds"] = round(took, 4)
+        results[f"parse_counts.{n}.rows_per_sec"] = round(n / took, 1)
+
+        # every text different (live tweets): nothing to share, each text is parsed anyway
+        unique = [f"{i:,}" for i in range(n)]
+        took = best_of(lambda: parse_counts(unique, "UInt64"))
+        results[f"parse_counts_unique.{n}.seconds"] = round(took, 4)
+        results[f"parse_counts_unique.{n}.rows_per_sec"] = round(n / took, 1)
+
+        rows = synthetic_rows(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tweets.csv")
+            results[f"save_to_csv.{n}.seconds"] = round(best_of(lambda: CSVHandler.save_to_csv(rows, path), 3), 4)
+
+            df = CSVHandler.load_from_csv(path)
+            results[f"find_originator.{n}.seconds"] = round(best_of(lambda: OriginatorFinder.find_originator(df)), 4)
+        del rows, df
+    return results
+
+
+# runs main.py in a new process, says how long main() took and if Selenium got imported
+STARTUP_CODE = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+import main
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        main.main(sys.argv[1:])
+    except SystemExit:
+        pass
+print(json.dumps({"ms": (time.perf_counter() - start) * 1000, "selenium": "selenium" in sys.modules}))
+"""
+
+
+def bench_startup(runs=5, rows=1000):
+    here = os.path.dirname(os.path.abspath(__file__))
+    results, selenium = {}, False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tweets.csv")
+        data = synthetic_rows(rows)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(data[0]))
+            writer.writeheader()
+            writer.writerows(data)
+        for name, argv in [("help", ["--help"]), ("stats", ["stats", path])]:
+            main_ms, total_ms = [], []
+            for _ in range(runs):
+                start = time.perf_counter()
+                done = subprocess.run([sys.executable, "-c", STARTUP_CODE] + argv, cwd=here,
+                                      capture_output=True, text=True, check=True)
+                total_ms.append((time.perf_counter() - start) * 1000)
+                out = json.loads(done.stdout.strip().splitlines()[-1])
+                main_ms.append(out["ms"])
+                selenium = selenium or out["selenium"]
+            # median: one slow run (cold disk cache) does not count
+            results[f"startup.{name}.main_ms"] = round(statistics.median(main_ms), 1)
+            results[f"startup.{name}.process_ms"] = round(statistics.median(total_ms), 1)
+    results["startup.selenium_imported"] = int(selenium)
+    return results
+
+
+# metrics that must stay 0 (no baseline needed), and plain counts (not compared)
+MUST_BE_ZERO = (".missed_windows", ".selenium_imported")
+NOT_COMPARED = (".cards", ".rate_limits")
+
+
+def missing_in_baseline(results, baseline):
+    # measured metrics the baseline has no number for: they would pass without any check
+    return [key for key in results
+            if not key.endswith(MUST_BE_ZERO + NOT_COMPARED) and not isinstance(baseline.get(key), (int, float))]
+
+
+def compare(results, baseline):
+    # list of (metric, old, new) that got worse than the tolerance
+    worse = []
+    for key, new in results.items():
+        if key.endswith(MUST_BE_ZERO):
+            if new:
+                worse.append((key, 0, new))  # must stay 0, no matter the baseline
+            continue
+        old = baseline.get(key)
+        if not isinstance(old, (int, float)) or not old or key.endswith(NOT_COMPARED):
+            continue
+        if key.endswith(HIGHER_IS_BETTER):
+            bad = new < old * (1 - TOLERANCE)
+        else:
+            bad = new > old * (1 + TOLERANCE)
+        if bad:
+            worse.append((key, old, new))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scraper hot paths.")
+    parser.add_argument("--cards", type=int, default=500, help="Tweet cards on the synthetic search page (default: 500)")
+    parser.add_argument("--profiles", type=int, default=10, help="Profiles to scrape (default: 10)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Row counts for the micro benchmarks (default: 10000 100000 1000000)")
+    parser.add_argument("--sessions", type=int, default=0,
+                        help="Also run SessionScheduler with this many sessions on a rate-limiting server (default: 0 = off)")
+    parser.add_argument("--skip-browser", action="store_true", help="Only run the micro benchmarks")
+    parser.add_argument("--skip-micro", action="store_true", help="Only run the browser benchmarks")
+    parser.add_argument("--baseline", default=BASELINE, help=f"Baseline file (default: {BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="Save these results as the new baseline")
+    args = parser.parse_args()
+
+    results = {}
+    memory = TreeMemory()
+    if not args.skip_browser:
+        with memory:
+            results.update(bench_browser(args.cards, args.profiles))
+            if args.sessions:
+                results.update(bench_sessions(args.cards, args.sessions))
+    if not args.skip_micro:
+        results.update(bench_startup())
+        results.update(bench_micro(args.sizes))
+    results.update(memory.results())
+
+    for key, value in results.items():
+        print(f"{key:40s} {value}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Baseline saved -> {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        worse = compare(results, baseline)
+        for key, old, new in worse:
+            print(f"[REGRESSION] {key}: {old} -> {new}")
+        # a metric without a baseline number is not checked at all: fail instead of a quiet pass
+        missing = missing_in_baseline(results, baseline)
+        if missing:
+            print(f"[ERR] Not in {args.baseline} (run with --save-baseline on this machine first):",
+                  ", ".join(missing))
+        if worse or missing:
+            sys.exit(1)
+        print("[OK] No regression against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os, queue, threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from network_capture import enable_capture
+from cookies_loader import CookiesLoader
+from metrics import count_driver_calls
+
+
+# What a lean browser does not download: videos, fonts, trackers/ads and X's telemetry.
+# (Images are turned off with a Chrome setting; their URLs are still in the page.)
+BLOCKED_URLS = [
+    "*video.twimg.com*", "*.mp4*", "*.m3u8*", "*.m4s*", "*.webm*",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*ads-twitter.com*", "*ads-api.x.com*", "*/i/api/1.1/jot/*",
+]
+
+
+def _lean_options(opts, cache_dir):
+    # no images, no autoplay, a fixed cache folder (kept between runs)
+    opts.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_argument("--autoplay-policy=user-gesture-required")
+    opts.add_argument("--mute-audio")
+    if cache_dir:
+        opts.add_argument(f"--disk-cache-dir={os.path.abspath(cache_dir)}")
+
+
+def _block_urls(driver, patterns):
+    # DevTools: the browser never asks for these URLs
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        print("[WARN] Could not block URLs:", e)
+
+
+def make_driver(headless: bool = False, capture: bool = False, lean: bool = True,
+                cache_dir: str | None = None, block_urls=None):
+    # Start a Chrome browser with our usual options
+    # capture=True keeps the network log for NetworkCapture (see network_capture.py)
+    # lean=True blocks media, fonts and trackers (lean=False for runs that need media)
+    # cache_dir keeps Chrome's disk cache between runs (only one browser per folder)
+    opts = Options()
+    if headless:
+        opts.add_argument("--headless=new")
+        opts.add_argument("--disable-gpu")
+        opts.add_argument("--window-size=1920,1080")
+        opts.add_argument("--no-sandbox")
+        opts.add_argument("--disable-dev-shm-usage")
+    else:
+        opts.add_argument("--start-maximized")
+    if capture:
+        enable_capture(opts)
+    if lean:
+        _lean_options(opts, cache_dir)
+
+    # every WebDriver command is counted in the run metrics
+    driver = count_driver_calls(webdriver.Chrome(options=opts))
+    if lean:
+        _block_urls(driver, BLOCKED_URLS if block_urls is None else block_urls)
+    return driver
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """A fixed number of Chrome browsers that stay open and logged in.
+
+    Browsers start the first time they are needed (cookies are loaded once per
+    browser), and go back to the pool after each job, so the next job starts warm.
+    After close(), a browser that was still starting (or is given back) is closed too.
+    """
+
+    def __init__(self, size=2, headless=True, cookies_path="twitter_cookies.json", lean=True):
+        self.size = size
+        self.headless = headless
+        self.lean = lean
+        self.cookies_path = cookies_path
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _new_driver(self):
+        driver = make_driver(self.headless, lean=self.lean)
+        try:
+            CookiesLoader.load_cookies(driver, self.cookies_path)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def acquire(self):
+        # give an idle browser, start a new one if the pool is not full, else wait for one
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                start_new = len(self._all) < self.size
+                if start_new:
+                    self._all.append(None)  # keep the place while Chrome starts
+            if start_new:
+                break
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue  # check again, a broken browser may have left a free place
+        try:
+            driver = self._new_driver()
+        except Exception:
+            with self._lock:
+                self._all.remove(None)
+            raise
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._all[self._all.index(None)] = driver
+        if closed:
+            # close() ran while Chrome was starting: nobody would quit this one
+            _quit(driver)
+            raise RuntimeError("DriverPool is closed")
+        return driver
+
+    def release(self, driver):
+        with self._lock:
+            closed = self._closed
+        if closed:
+            _quit(driver)
+        else:
+            self._idle.put(driver)
+
+    def discard(self, driver):
+        # a broken browser: close it, the next acquire() starts a fresh one
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        _quit(driver)
+
+    @contextmanager
+    def driver(self):
+        d = self.acquire()
+        try:
+            yield d
+        except Exception:
+            self.discard(d)
+            raise
+        else:
+            self.release(d)
+
+    def close(self):
+        # quit the started browsers; the ones still starting are quit by acquire()
+        with self._lock:
+            self._closed = True
+            drivers, self._all = [d for d in self._all if d is not None], []
+        for d in drivers:
+            _quit(d)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,4 +1,5 @@
-import json, os
+import json, os, time
+from metrics import metrics
 
 class CookiesLoader:
     @staticmethod
@@ -11,6 +12,8 @@ class CookiesLoader:
         with open(path, "r", encoding="utf-8") as f:
             cookies = json.load(f)
 
+        start = time.perf_counter()
+
         # First open x.com
         driver.get("https://x.com/")
 
@@ -24,9 +27,12 @@ class CookiesLoader:
 
             try:
                 driver.add_cookie(cookie)  # add cookie into browser
+                metrics.incr("cookies.added")
             except Exception as e:
+                metrics.incr("cookies.skipped")
                 print("⚠️ Skipped cookie:", cookie.get("name"), e)  # if fails, then just skip
 
         # Reload the page with cookies now applied
         driver.refresh()
+        metrics.add_time("cookies.load", time.perf_counter() - start)
         print("✅ Cookies loaded.")
@@ -1,10 +1,139 @@
+import csv, os, time
 import pandas as pd
+from metrics import metrics
+from records import TWEET_COLUMNS, COUNT_DTYPES, parse_counts
+
+COLUMNS = TWEET_COLUMNS
+
+# Column types for the typed (Parquet) output
+COUNT_COLUMNS = ["likes", "comments", "reposts", "views"]
+TIME_COLUMNS = ["post_time", "scrape_time"]
+CATEGORY_COLUMNS = ["user_handle", "hashtags"]  # few different values, saved dictionary-encoded
+
+
+def typed_frame(df):
+    """Same columns as the CSV, but with real types: fixed-width int counts, UTC timestamps, categories."""
+    for col in COLUMNS:
+        if col not in df.columns: df[col] = None
+    df = df[COLUMNS].copy()
+    for col in COUNT_COLUMNS:
+        # "1.2K" and "3,400" too, one column at a time (see records.parse_counts)
+        df[col] = parse_counts(df[col], COUNT_DTYPES[col])
+    for col in TIME_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("string").astype("category")
+    for col in ["tweet_url", "tweet_id", "profile_url", "content"]:
+        df[col] = df[col].astype("string")
+    return df
+
+
+def _arrow_schema():
+    import pyarrow as pa
+    text = pa.dictionary(pa.int32(), pa.string())
+    ts = pa.timestamp("ns", tz="UTC")
+    return pa.schema([
+        ("tweet_url", pa.string()), ("tweet_id", pa.string()),
+        ("user_handle", text), ("profile_url", pa.string()),
+        ("content", pa.string()), ("hashtags", text),
+        ("post_time", ts), ("scrape_time", ts),
+        ("likes", pa.uint32()), ("comments", pa.uint32()),
+        ("reposts", pa.uint32()), ("views", pa.uint64()),
+    ])
+
+
+class CSVStream:
+    """Write tweets to CSV while scraping, a few rows at a time.
+
+    Rows wait in a small buffer and are written every `batch_size` rows or every
+    `flush_every` seconds. After each write, the new tweet IDs are added to a
+    checkpoint file (`<filename>.seen`), so a crashed run can be resumed.
+    `on_write` (optional) is called with every row, e.g. OriginatorTracker.add.
+    When resuming, `resume_max_id` is just below the oldest saved tweet, so the
+    search can go on from there instead of scrolling the saved tweets again.
+    """
+
+    def __init__(self, filename="tweets.csv", resume=False, batch_size=100, flush_every=10.0,
+                 on_write=None):
+        self.filename = filename
+        self.checkpoint = filename + ".seen"
+        self.batch_size = batch_size
+        self.flush_every = flush_every
+        self.on_write = on_write
+        self.seen_ids = set()   # all tweet IDs already saved (from old runs too when resuming)
+        self.count = 0          # rows written in this run
+        self._rows = []         # rows waiting to be written
+        self._last_flush = time.monotonic()
+
+        rebuilt = False
+        if resume and os.path.exists(self.filename):
+            # load the IDs we already saved, and keep adding to the same files
+            if os.path.exists(self.checkpoint):
+                with open(self.checkpoint, "r", encoding="utf-8") as f:
+                    self.seen_ids = {line.strip() for line in f if line.strip()}
+            else:
+                # no checkpoint (deleted, or an older CSV): take the IDs from the CSV itself
+                self.seen_ids = self._ids_in_csv()
+                rebuilt = True
+            mode = "a"
+        else:
+            mode = "w"
+
+        self._f = open(self.filename, mode, newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=COLUMNS, extrasaction="ignore")
+        self._ckpt = open(self.checkpoint, mode, encoding="utf-8")
+        if mode == "w":
+            self._writer.writeheader()
+        if rebuilt:
+            self._ckpt.writelines(f"{tid}\n" for tid in self.seen_ids)
+            self._ckpt.flush()
+
+        # oldest saved tweet (IDs grow with time): a resumed search starts below it
+        old = [int(t) for t in self.seen_ids if t.isdigit()]
+        self.resume_max_id = min(old) - 1 if old else None
+
+    def _ids_in_csv(self):
+        with open(self.filename, "r", newline="", encoding="utf-8") as f:
+            return {row["tweet_id"] for row in csv.DictReader(f) if row.get("tweet_id")}
+
+    def write(self, row):
+        self.seen_ids.add(row.get("tweet_id"))
+        self._rows.append(row)
+        if self.on_write:
+            self.on_write(row)
+        if len(self._rows) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        with metrics.timed("csv.flush"):
+            self._flush()
+        metrics.incr("csv.rows", len(self._rows))
+        self._rows = []
+
+    def _flush(self):
+        # rows first, then their IDs, so every ID in the checkpoint is already in the CSV
+        self._writer.writerows(self._rows)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._ckpt.writelines(f"{r.get('tweet_id')}\n" for r in self._rows)
+        self._ckpt.flush()
+        os.fsync(self._ckpt.fileno())
+        self.count += len(self._rows)
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+        self._ckpt.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-COLUMNS = [
-    "tweet_url","tweet_id","user_handle","profile_url",
-    "content","hashtags","post_time","scrape_time",
-    "likes","comments","reposts","views"
-]
 
 class CSVHandler:
     @staticmethod
@@ -18,8 +147,41 @@ class CSVHandler:
         # but will be saved in the proper format of columns
         df = df[COLUMNS]
         
-        df.to_csv(filename, index=False, encoding="utf-8")
+        with metrics.timed("csv.save"):
+            df.to_csv(filename, index=False, encoding="utf-8")
+
+    @staticmethod
+    def open_stream(filename="tweets.csv", resume=False, batch_size=100, flush_every=10.0, on_write=None):
+        # streaming sink: rows are saved during the scrape, not only at the end
+        return CSVStream(filename, resume=resume, batch_size=batch_size, flush_every=flush_every,
+                         on_write=on_write)
 
     @staticmethod
     def load_from_csv(filename="tweets.csv"):
         return pd.read_csv(filename)
+
+    # Parquet needs pyarrow (pip install pyarrow)
+    @staticmethod
+    def save_to_parquet(data, filename="tweets.parquet", compression="zstd"):
+        df = typed_frame(pd.DataFrame(data))
+        df.to_parquet(filename, engine="pyarrow", compression=compression, index=False)
+
+    @staticmethod
+    def csv_to_parquet(csv_file="tweets.csv", filename=None, chunksize=100_000, compression="zstd"):
+        # convert a (big) CSV to Parquet part by part, so memory stays small
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        filename = filename or csv_file.rsplit(".", 1)[0] + ".parquet"
+        schema = _arrow_schema()
+        with pq.ParquetWriter(filename, schema, compression=compression) as writer:
+            for chunk in pd.read_csv(csv_file, dtype=str, chunksize=chunksize):
+                table = pa.Table.from_pandas(typed_frame(chunk), schema=schema, preserve_index=False)
+                writer.write_table(table)
+        return filename
+
+    @staticmethod
+    def load_from_parquet(filename="tweets.parquet", columns=None):
+        # only the columns we ask for are read from disk
+        # (nullable types: a count column with empty cells stays UInt32/UInt64, not float64)
+        return pd.read_parquet(filename, columns=columns, engine="pyarrow", dtype_backend="numpy_nullable")
@@ -1,61 +1,287 @@
 # main.py
-import argparse
+import argparse, csv, sys
+from collections import Counter
+from datetime import date
 from typing import Optional
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 
-from cookies_loader import CookiesLoader
-from search_scraper import SearchScraper
-from csv_handler import CSVHandler
-from originator_finder import OriginatorFinder
-from profile_scraper import ProfileScraper
+# Only the standard library here: every command imports what it needs when it runs,
+# so the offline commands (originator, stats) start fast and never load Selenium or Chrome.
+COMMANDS = ["scrape", "originator", "stats", "profile"]
 
 
-def run(hashtag: str, limit: Optional[int] = None, out_csv: str = "tweets.csv", headless: bool = False):
+def run(hashtag: str, limit: Optional[int] = None, out_csv: str = "tweets.csv", headless: bool = False,
+        resume: bool = False, bisect: bool = False, workers: int = 1,
+        since: Optional[date] = None, until: Optional[date] = None, network: bool = False,
+        snapshot: bool = False, cache_ttl: float = 24, incremental: bool = False,
+        top_authors: int = 0, top_by: str = "volume", profile_workers: int = 3, parquet: bool = False,
+        metrics_path: Optional[str] = None, pipeline: int = 0, snapshots: Optional[str] = None,
+        lean: bool = True, recycle_mb: Optional[int] = None, recycle_scrolls: Optional[int] = None,
+        db: Optional[str] = None, sessions: Optional[list] = None, per_minute: float = 30):
     """Scrape tweets for a hashtag, save to CSV, find originator, and scrape profile."""
-    opts = Options()
-    if headless:
-        opts.add_argument("--headless=new")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--window-size=1920,1080")
-        opts.add_argument("--no-sandbox")
-        opts.add_argument("--disable-dev-shm-usage")
-    else:
-        opts.add_argument("--start-maximized")
+    from browser import make_driver, DriverPool
+    from cookies_loader import CookiesLoader
+    from search_scraper import SearchScraper
+    from sharded_scraper import ShardedScraper
+    from session_pool import SessionPool, SessionScheduler
+    from pipelined_scraper import PipelinedSearchScraper
+    from csv_handler import CSVHandler
+    from network_capture import NetworkCapture
+    from originator_finder import OriginatorFinder, OriginatorTracker
+    from profile_scraper import ProfileScraper
+    from profile_cache import ProfileCache
+    from tweet_index import TweetIndex
+    from snapshot_store import SnapshotStore
+    from tweet_store import TweetStore
+    from metrics import metrics
+    from utils import RateLimited
 
-    driver = webdriver.Chrome(options=opts)
+    # raw pages saved to parse again later without the browser (reparse.py)
+    store = SnapshotStore(snapshots) if snapshots else None
+    driver = capture = cache = None
 
-    try:
-        #  Authentication with cookies
-        CookiesLoader.load_cookies(driver, "twitter_cookies.json")
+    def open_browser(cookies_path):
+        # the browser of this run, logged in with the cookies
+        # (with network capture: tweets and profiles from X's API responses instead of the page)
+        nonlocal driver, capture
+        driver = make_driver(headless, capture=network, lean=lean, cache_dir="chrome_cache" if lean else None)
+        capture = NetworkCapture(driver, store=store) if network else None
+        CookiesLoader.load_cookies(driver, cookies_path)
 
-        # Search + scrape tweets
-        search = SearchScraper(driver)
-        tweets = search.search_hashtag(hashtag, limit=limit)
+    try:
+        # With --sessions the accounts of the pool scrape the tweets: the default cookies
+        # are not needed, the profile below uses the first session's cookies
+        if bisect or not sessions:
+            open_browser("twitter_cookies.json")
 
-        # Save CSV
-        CSVHandler.save_to_csv(tweets, out_csv)
-        print(f"[OK] Saved {len(tweets)} rows -> {out_csv}")
+        # Search + scrape tweets, saving them to CSV while scrolling
+        # (the tracker keeps the earliest tweet while the tweets arrive)
+        # (with pipeline workers, other threads clean the tweets while this one scrolls)
+        if pipeline > 0:
+            search = PipelinedSearchScraper(driver, workers=pipeline, capture=capture, store=store,
+                                            recycle_mb=recycle_mb, recycle_scrolls=recycle_scrolls)
+        else:
+            search = SearchScraper(driver, capture=capture, store=store,
+                                   recycle_mb=recycle_mb, recycle_scrolls=recycle_scrolls)
+        tracker = OriginatorTracker()
+        sharded = None  # ShardedScraper / SessionScheduler, for the windows it missed
+        with CSVHandler.open_stream(out_csv, resume=resume, on_write=tracker.add) as sink:
+            if resume:
+                print(f"[OK] Resuming with {len(sink.seen_ids)} tweets already saved")
+            # a resumed run goes on below the oldest saved tweet (the newer ones are in the CSV)
+            start_id = sink.resume_max_id if resume else None
+            try:
+                if bisect:
+                    # only the earliest day with tweets (binary search on date windows)
+                    search.search_originator(hashtag, start=since, end=until, sink=sink)
+                elif sessions:
+                    # several accounts take turns, a rate-limited one cools down while the others go on
+                    with SessionPool(sessions, per_minute=per_minute, headless=headless, lean=lean) as pool:
+                        sharded = SessionScheduler(pool)
+                        sharded.scrape(hashtag, since, until, limit=limit, sink=sink)
+                        for st in pool.stats():
+                            print("[OK] Session:", st)
+                elif workers > 1:
+                    # date windows scraped by several browsers at the same time
+                    sharded = ShardedScraper(workers, headless, lean=lean)
+                    sharded.scrape(hashtag, since, until, limit=limit, sink=sink)
+                elif incremental:
+                    # only the tweets newer than the last run of this hashtag
+                    with TweetIndex(hashtag) as index:
+                        # a resumed run already has the newest tweets in the CSV (above start_id)
+                        for tid in sink.seen_ids if resume else ():
+                            index.add(tid)
+                        search.search_hashtag(hashtag, limit=limit, sink=sink, since=since, until=until, index=index,
+                                              max_id=start_id)
+                else:
+                    search.search_hashtag(hashtag, limit=limit, sink=sink, since=since, until=until,
+                                          max_id=start_id)
+            except RateLimited as e:
+                # the rows before the block are already in the CSV, --resume goes on below them
+                print(f"[WARN] X stopped the search ({e.kind}) after {sink.count} rows -> {out_csv}, "
+                      "run again later with --resume")
+                return
+        print(f"[OK] Saved {sink.count} rows -> {out_csv}")
+        if sharded is not None and sharded.missed:
+            # not the whole date range: say so instead of a quietly shorter result
+            print(f"[WARN] {len(sharded.missed)} date windows not scraped (their tweets are missing):",
+                  ", ".join(f"{a} -> {b}" for a, b in sorted(sharded.missed)))
+        if parquet:
+            print("[OK] Typed copy ->", CSVHandler.csv_to_parquet(out_csv))
+        if db:
+            # add this run to the database of all runs (same tweet_id = updated, not added twice)
+            # (not `store`: that name is the SnapshotStore, still used for the profiles below)
+            with TweetStore(db) as tweet_db:
+                tweet_db.import_csv(out_csv)
+                print(f"[OK] {tweet_db.count()} tweets in {db}")
 
         # Find originator (earliest post_time)
-        df = CSVHandler.load_from_csv(out_csv)
-        origin = OriginatorFinder.find_originator(df)
+        # a resumed run also has old rows in the CSV, so read the file in parts
+        origin = OriginatorFinder.find_originator_in_csv(out_csv) if resume else tracker.originator
+        if origin is None:
+            print("[WARN] No tweet with a valid post time, no originator to scrape")
+            return
         print("[OK] Originator candidate:", origin)
 
         # Scrape originator profile
-        prof = ProfileScraper(driver).scrape_profile(origin["profile_url"])
-        print("[OK] Originator profile data:")
+        # (a profile scraped less than cache_ttl hours ago comes from the cache)
+        if driver is None:
+            open_browser(sessions[0])
+        cache = ProfileCache(ttl=cache_ttl * 3600) if cache_ttl > 0 else None
+        scraper = ProfileScraper(driver, capture=capture, snapshot=snapshot, cache=cache, store=store)
+        prof = None
+        if not origin["profile_url"]:
+            print("[WARN] The originator tweet has no profile link, no profile to scrape")
+        else:
+            try:
+                prof = scraper.scrape_profile(origin["profile_url"])
+            except RuntimeError as e:
+                print("[WARN] Originator profile not scraped:", e)
+        if prof is not None:
+            print("[OK] Originator profile data:")
+            for k, v in prof.items():
+                print(f"  - {k}: {v}")
+
+        # Scrape the profiles of the top authors, several at the same time
+        if top_authors:
+            urls = OriginatorFinder.top_authors(out_csv, top_authors, by=top_by)
+            with DriverPool(profile_workers, headless, lean=lean) as pool:
+                profiles = ProfileScraper.scrape_many(urls, pool, cache=cache, snapshot=snapshot)
+            print(f"[OK] Saved {len(profiles)} top author profiles -> profiles.csv")
+
+        if cache is not None:
+            print("[OK] Profile cache:", cache.stats())
+
+    finally:
+        if driver is not None:
+            driver.quit()
+        if cache is not None:
+            cache.close()
+        if metrics_path:
+            # timings and counters of this run (JSON, or Prometheus text for .prom/.txt)
+            metrics.save(metrics_path)
+            print(f"[OK] Metrics -> {metrics_path}")
+
+
+def originator(filename: str, k: int = 1):
+    """Originator (earliest tweet) of a CSV or Parquet file from an earlier run, no browser."""
+    from originator_finder import OriginatorFinder
+    if filename.endswith(".parquet"):
+        origins = [OriginatorFinder.find_originator_in_parquet(filename)]
+    elif k > 1:
+        origins = OriginatorFinder.earliest_in_csv(filename, k=k)
+    else:
+        origins = [OriginatorFinder.find_originator_in_csv(filename)]
+    origins = [o for o in origins if o]
+    if not origins:
+        print("[WARN] No tweet with a valid post time in", filename)
+        return
+    for i, o in enumerate(origins, 1):
+        print(f"[OK] #{i}:" if k > 1 else "[OK] Originator:", o)
+
+
+def stats(filename: str, top: int = 10):
+    """Summary of a tweets CSV: rows, authors, time range, engagement, top authors and hashtags.
+
+    Reads the file row by row with the csv module (no pandas), so it starts at once
+    and works on files bigger than the memory.
+    """
+    rows, ids, authors, tags = 0, set(), Counter(), Counter()
+    first = last = None
+    totals = Counter()
+    with open(filename, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            rows += 1
+            ids.add(row.get("tweet_id"))
+            if row.get("user_handle"):
+                authors[row["user_handle"]] += 1
+            for tag in (row.get("hashtags") or "").split(";"):
+                if tag.strip("#"):
+                    tags[tag.lower()] += 1
+            t = row.get("post_time")
+            if t:
+                # ISO times: text order is time order
+                first = t if first is None or t < first else first
+                last = t if last is None or t > last else last
+            for col in ("likes", "comments", "reposts", "views"):
+                try:
+                    totals[col] += int(float(row.get(col) or 0))  # saved as "12" or "12.0"
+                except ValueError:
+                    pass
+
+    print(f"[OK] {filename}: {rows} rows, {len(ids)} unique tweets, {len(authors)} authors")
+    print(f"  - first post: {first}")
+    print(f"  - last post:  {last}")
+    for col in ("likes", "comments", "reposts", "views"):
+        print(f"  - {col}: {totals[col]}")
+    print("  - top authors: " + ", ".join(f"{a} ({n})" for a, n in authors.most_common(top)))
+    print("  - top hashtags: " + ", ".join(f"{t} ({n})" for t, n in tags.most_common(top)))
+
+
+def profile(target: str, headless: bool = False, cache_ttl: float = 24, lean: bool = True):
+    """Scrape one profile (handle or URL) and add it to profiles.csv; a fresh cached one needs no browser."""
+    from profile_cache import ProfileCache
+    url = target if target.startswith("http") else f"https://x.com/{target.lstrip('@')}"
+    cache = ProfileCache(ttl=cache_ttl * 3600) if cache_ttl > 0 else None
+    try:
+        prof = cache.get(url.rstrip("/").split("/")[-1]) if cache is not None else None
+        if prof is None:
+            from browser import make_driver
+            from cookies_loader import CookiesLoader
+            from profile_scraper import ProfileScraper
+            driver = make_driver(headless, lean=lean)
+            try:
+                CookiesLoader.load_cookies(driver, "twitter_cookies.json")
+                prof = ProfileScraper(driver, cache=cache).scrape_profile(url)
+            finally:
+                driver.quit()
+        print("[OK] Profile data:")
         for k, v in prof.items():
             print(f"  - {k}: {v}")
-
     finally:
-        driver.quit()
+        if cache is not None:
+            cache.close()
+
 
 # here the configuration for running this script
-def main():
-    parser = argparse.ArgumentParser(
+def _is_legacy_scrape(argv, parser):
+    # old style "python main.py [options] genai ..." has no command: the first word that is not
+    # an option (or the value of one, like the 50 of "-l 50") is the hashtag, not a command
+    # (a hashtag named like a command needs the command: "python main.py scrape stats")
+    takes_value = {flag for action in parser._actions if action.nargs != 0 for flag in action.option_strings}
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg.startswith("-"):
+            skip = arg in takes_value  # "--limit=50" is one word, nothing to skip
+        else:
+            return arg not in COMMANDS
+    return False  # only options ("--help"): argparse answers
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    root = argparse.ArgumentParser(
         description="Twitter/X Hashtag Scraper: Scrape tweets, find originator, and extract profile data."
     )
+    commands = root.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("originator", help="Earliest tweet of an earlier run (CSV or Parquet), no browser")
+    p.add_argument("file", help="tweets.csv or tweets.parquet")
+    p.add_argument("-k", type=int, default=1, help="Show the k earliest tweets (CSV only, default: 1)")
+
+    p = commands.add_parser("stats", help="Summary of a tweets CSV (rows, authors, time range, engagement), no browser")
+    p.add_argument("file", help="tweets.csv")
+    p.add_argument("-n", "--top", type=int, default=10, help="How many top authors and hashtags (default: 10)")
+
+    p = commands.add_parser("profile", help="Scrape one profile (uses the profile cache first)")
+    p.add_argument("target", help="Handle or profile URL")
+    p.add_argument("--headless", action="store_true", help="Run Chrome in headless mode")
+    p.add_argument("--cache-ttl", type=float, default=24, help="Hours a cached profile is used (default: 24, 0 = off)")
+    p.add_argument("--keep-media", action="store_true", help="Load images, videos and fonts")
+
+    parser = commands.add_parser("scrape", help="Scrape a hashtag with the browser (default command)")
     parser.add_argument("hashtag", help="Hashtag to scrape (without the #)")
     parser.add_argument(
         "-l", "--limit", type=int, default=None,
@@ -69,9 +295,126 @@ def main():
         "--headless", action="store_true",
         help="Run Chrome in headless mode (no visible browser window)"
     )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue a stopped run: keep the rows in the output CSV and skip tweets already saved"
+    )
+    parser.add_argument(
+        "--bisect", action="store_true",
+        help="Find the originator fast: binary search on date windows and scrape only the earliest day"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="Number of browsers that scrape date windows in parallel (default: 1)"
+    )
+    parser.add_argument(
+        "--since", type=date.fromisoformat, default=None,
+        help="Only tweets from this day (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--until", type=date.fromisoformat, default=None,
+        help="Only tweets before this day (YYYY-MM-DD, not included)"
+    )
+    parser.add_argument(
+        "--network", action="store_true",
+        help="Read tweets and profiles from X's API responses (network log) instead of the page"
+    )
+    parser.add_argument(
+        "--snapshot", action="store_true",
+        help="Parse the profile from one HTML snapshot instead of many browser queries (needs lxml)"
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float, default=24,
+        help="Reuse profiles scraped less than this many hours ago (default: 24, 0 = no cache)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Scrape only tweets newer than the last run of this hashtag (newest ID kept in tweet_index.db)"
+    )
+    parser.add_argument(
+        "--top-authors", type=int, default=0,
+        help="Also scrape the profiles of the N top authors of the hashtag (default: 0)"
+    )
+    parser.add_argument(
+        "--top-by", choices=["volume", "engagement"], default="volume",
+        help="Rank top authors by number of tweets or by likes+comments+reposts (default: volume)"
+    )
+    parser.add_argument(
+        "--profile-workers", type=int, default=3,
+        help="Number of browsers that scrape top author profiles at the same time (default: 3)"
+    )
+    parser.add_argument(
+        "--parquet", action="store_true",
+        help="Also save a typed, compressed Parquet copy of the CSV (needs pyarrow)"
+    )
+    parser.add_argument(
+        "--metrics", default=None,
+        help="Save run metrics (timings, driver calls, card counts) to this file: JSON, or Prometheus text for .prom"
+    )
+    parser.add_argument(
+        "--pipeline", type=int, default=0, metavar="WORKERS",
+        help="Clean tweets in this many worker threads while the browser keeps scrolling (default: 0 = off)"
+    )
+    parser.add_argument(
+        "--snapshots", default=None, metavar="DIR",
+        help="Save compressed raw pages to this folder, to parse them again later with reparse.py"
+    )
+    parser.add_argument(
+        "--keep-media", action="store_true",
+        help="Load images, videos and fonts (default: blocked, we only need their URLs)"
+    )
+    parser.add_argument(
+        "--recycle-mb", type=int, default=None,
+        help="Long runs: reload the search from the oldest tweet when the page uses more JS memory than this (MB)"
+    )
+    parser.add_argument(
+        "--recycle-scrolls", type=int, default=None,
+        help="Long runs: reload the search from the oldest tweet after this many scrolls"
+    )
+    parser.add_argument(
+        "--db", default=None,
+        help="Also add the tweets to this SQLite database (indexed, full-text search, see tweet_store.py)"
+    )
+    parser.add_argument(
+        "--sessions", nargs="+", default=None, metavar="COOKIES",
+        help="Cookie files of several accounts: they take turns, and a rate-limited one cools down"
+    )
+    parser.add_argument(
+        "--per-minute", type=float, default=30,
+        help="With --sessions: max page loads + scrolls per minute for each account (default: 30)"
+    )
 
-    args = parser.parse_args()
-    run(args.hashtag, args.limit, args.output, args.headless)
+    if _is_legacy_scrape(argv, parser):
+        argv = ["scrape"] + argv
+    args = root.parse_args(argv)
+    if args.command == "scrape" and args.incremental:
+        # these modes scrape date windows or one day, not the newest tweets down to the last run
+        other = [flag for flag, on in (("--bisect", args.bisect), ("--workers", args.workers > 1),
+                                       ("--sessions", args.sessions)) if on]
+        if other:
+            parser.error(f"--incremental can not be used with {', '.join(other)}")
+    if args.command == "scrape" and (args.workers > 1 or args.sessions) and not args.bisect:
+        # the date windows are scraped by the workers' own browsers, which have none of these
+        other = [flag for flag, on in (("--snapshots", args.snapshots), ("--network", args.network),
+                                       ("--pipeline", args.pipeline), ("--recycle-mb", args.recycle_mb),
+                                       ("--recycle-scrolls", args.recycle_scrolls)) if on]
+        if other:
+            mode = "--sessions" if args.sessions else "--workers"
+            parser.error(f"{mode} can not be used with {', '.join(other)}")
+    if args.command == "originator":
+        return originator(args.file, args.k)
+    if args.command == "stats":
+        return stats(args.file, args.top)
+    if args.command == "profile":
+        return profile(args.target, args.headless, args.cache_ttl, not args.keep_media)
+    # by name: run() has many flags, a swapped position would quietly mix them up
+    run(args.hashtag, limit=args.limit, out_csv=args.output, headless=args.headless, resume=args.resume,
+        bisect=args.bisect, workers=args.workers, since=args.since, until=args.until, network=args.network,
+        snapshot=args.snapshot, cache_ttl=args.cache_ttl, incremental=args.incremental,
+        top_authors=args.top_authors, top_by=args.top_by, profile_workers=args.profile_workers,
+        parquet=args.parquet, metrics_path=args.metrics, pipeline=args.pipeline, snapshots=args.snapshots,
+        lean=not args.keep_media, recycle_mb=args.recycle_mb, recycle_scrolls=args.recycle_scrolls,
+        db=args.db, sessions=args.sessions, per_minute=args.per_minute)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+import json, threading, time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+# Counter families with one counter per value ("driver.calls.findElement"):
+# in Prometheus they are one metric with this label
+LABELED = {
+    "driver.calls": "command",
+    "search.blocked": "kind",
+    "search.errors": "error",
+    "pipeline.errors": "error",
+}
+
+
+class Metrics:
+    """Counters and timers for one run, saved as JSON or Prometheus text at the end.
+
+    Counters are plain numbers (cards seen, driver calls, ...). Timers add up the
+    seconds and the number of times a phase ran. `record` keeps the last few
+    detailed events (like the numbers of each scroll).
+    """
+
+    def __init__(self, keep_events=1000):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.timers = defaultdict(lambda: [0.0, 0])  # name -> [total seconds, count]
+        self.events = defaultdict(lambda: deque(maxlen=keep_events))
+        self.started = time.time()
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            t = self.timers[name]
+            t[0] += seconds
+            t[1] += 1
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def record(self, name, **values):
+        with self._lock:
+            self.events[name].append(values)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "started": self.started,
+                "wall_seconds": round(time.time() - self.started, 3),
+                "counters": dict(sorted(self.counters.items())),
+                "timers": {k: {"seconds": round(v[0], 4), "count": v[1]} for k, v in sorted(self.timers.items())},
+                "events": {k: list(v) for k, v in self.events.items()},
+            }
+
+    def to_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def to_prometheus(self, path, prefix="scraper"):
+        # Prometheus text format: counters, and every timer as _seconds_total + _count.
+        # Counters named "<family>.<value>" of a LABELED family are one metric with a label,
+        # like scraper_driver_calls_total{command="findElement"} (the family's own total
+        # is left out there, it is the sum of the labeled ones).
+        def clean(name):
+            return prefix + "_" + "".join(c if c.isalnum() else "_" for c in name)
+
+        snap = self.snapshot()
+        plain, labeled = {}, defaultdict(dict)
+        for name, value in snap["counters"].items():
+            family = next((f for f in LABELED if name.startswith(f + ".")), None)
+            if family:
+                labeled[family][name[len(family) + 1:]] = value
+            elif name not in LABELED:
+                plain[name] = value
+        lines = []
+        for name, value in plain.items():
+            lines += [f"# TYPE {clean(name)}_total counter", f"{clean(name)}_total {value}"]
+        for family, values in sorted(labeled.items()):
+            lines.append(f"# TYPE {clean(family)}_total counter")
+            for label, value in sorted(values.items()):
+                label = label.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{clean(family)}_total{{{LABELED[family]}="{label}"}} {value}')
+        for name, t in snap["timers"].items():
+            lines += [
+                f"# TYPE {clean(name)}_seconds_total counter", f"{clean(name)}_seconds_total {t['seconds']}",
+                f"# TYPE {clean(name)}_count counter", f"{clean(name)}_count {t['count']}",
+            ]
+        lines += [f"# TYPE {prefix}_wall_seconds gauge", f"{prefix}_wall_seconds {snap['wall_seconds']}"]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def save(self, path):
+        # ".prom" / ".txt" files get the Prometheus format, others JSON
+        if path.endswith((".prom", ".txt")):
+            self.to_prometheus(path)
+        else:
+            self.to_json(path)
+
+
+# one shared registry for the whole run
+metrics = Metrics()
+
+
+def count_driver_calls(driver):
+    """Count every WebDriver command (each one is an HTTP round-trip to the browser)."""
+    executor = driver.command_executor
+    if getattr(executor, "_counted", False):
+        return driver
+    original = executor.execute
+
+    def execute(command, params):
+        metrics.incr("driver.calls")
+        metrics.incr(f"driver.calls.{command}")
+        with metrics.timed("driver.round_trip"):
+            return original(command, params)
+
+    executor.execute = execute
+    executor._counted = True
+    return driver
@@ -0,0 +1,221 @@
+import json, os, re, hashlib
+from collections import Counter
+from datetime import datetime
+from records import TweetRecord, ProfileRecord
+from utils import now_iso, extract_first
+
+# X's own API calls that have the data we need (GraphQL operation names)
+API_RE = re.compile(r"/i/api/graphql/[^/]+/(SearchTimeline|UserByScreenName|UserTweets)")
+
+# How many captured responses wait in the queue at most (the oldest are dropped)
+MAX_QUEUED = 200
+
+# X API time format, like "Wed Oct 10 20:19:24 +0000 2018"
+API_TIME = "%a %b %d %H:%M:%S %z %Y"
+
+
+def enable_capture(opts):
+    # Ask Chrome to keep a performance log (network events) that Selenium can read
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def _api_time(value, fmt):
+    try:
+        return datetime.strptime(value, API_TIME).strftime(fmt)
+    except (TypeError, ValueError):
+        return None
+
+
+def _walk(obj):
+    # go through every dict inside a JSON response
+    if isinstance(obj, dict):
+        yield obj
+        for v in obj.values():
+            yield from _walk(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _walk(v)
+
+
+def _tweet_result(node):
+    # "TweetWithVisibilityResults" wraps the real tweet in "tweet"
+    if node.get("__typename") == "TweetWithVisibilityResults":
+        node = node.get("tweet") or {}
+    return node if isinstance(node.get("legacy"), dict) and node.get("rest_id") else None
+
+
+def _user_core(user):
+    # the handle and name moved from "legacy" to "core" in newer responses, read both
+    legacy = user.get("legacy") or {}
+    core = user.get("core") or {}
+    return {
+        "screen_name": core.get("screen_name") or legacy.get("screen_name"),
+        "name": core.get("name") or legacy.get("name"),
+        "created_at": core.get("created_at") or legacy.get("created_at"),
+    }
+
+
+def parse_tweets(payload):
+    """All tweets of a SearchTimeline/UserTweets response, in the same format as SearchScraper."""
+    out = []
+    for node in _walk(payload):
+        res = node.get("tweet_results", {}).get("result") if isinstance(node.get("tweet_results"), dict) else None
+        tw = _tweet_result(res) if isinstance(res, dict) else None
+        if tw is None:
+            continue
+        legacy = tw["legacy"]
+        user = tw.get("core", {}).get("user_results", {}).get("result", {})
+        handle = _user_core(user)["screen_name"]
+        content = legacy.get("full_text")
+        tags = [h.get("text") for h in legacy.get("entities", {}).get("hashtags", [])]
+        views = tw.get("views", {}).get("count")
+        out.append(TweetRecord(
+            tweet_url=f"https://x.com/{handle}/status/{tw['rest_id']}" if handle else None,
+            tweet_id=tw["rest_id"],
+            user_handle=handle,
+            profile_url=f"https://x.com/{handle}" if handle else None,
+            content=content,
+            hashtags=";".join(f"#{t}" for t in tags if t),
+            post_time=_api_time(legacy.get("created_at"), "%Y-%m-%dT%H:%M:%S.000Z"),
+            scrape_time=now_iso(),
+            likes=legacy.get("favorite_count"),
+            comments=legacy.get("reply_count"),
+            reposts=legacy.get("retweet_count"),
+            views=int(views) if views and str(views).isdigit() else None,
+        ))
+    return out
+
+
+def parse_profile(payload):
+    """The user of a UserByScreenName response, in the same format as ProfileScraper (None if missing)."""
+    user = (payload.get("data", {}).get("user") or {}).get("result")
+    if not isinstance(user, dict) or not user.get("rest_id"):
+        return None
+    legacy = user.get("legacy") or {}
+    core = _user_core(user)
+    bio = legacy.get("description")
+    urls = legacy.get("entities", {}).get("url", {}).get("urls", [])
+    location = (user.get("location") or {}).get("location") or legacy.get("location") or None
+    protected = (user.get("privacy") or {}).get("protected", legacy.get("protected"))
+    verified = user.get("is_blue_verified") or (user.get("verification") or {}).get("verified") or legacy.get("verified")
+
+    # email/phone are not in the API, look in the bio like the page scraper does
+    return ProfileRecord.from_dict({
+        "username_handle": core["screen_name"],
+        "display_name": core["name"],
+        "user_id": user["rest_id"],
+        "bio": bio,
+        "email": extract_first(r'([\w\.-]+@[\w\.-]+\.\w+)', bio or ""),
+        "phone": extract_first(r'(\+?\d[\d\-\s]{7,}\d)', bio or ""),
+        "address": location,
+        "verification_status": "Verified" if verified else "Unverified",
+        "account_creation_date": _api_time(core["created_at"], "%B %Y"),
+        "account_type": "Business/Professional" if user.get("professional") else "Personal/Unknown",
+        "protected_status": "Private" if protected else "Public",
+        "followers_count": legacy.get("followers_count"),
+        "following_count": legacy.get("friends_count"),
+        "tweet_count": legacy.get("statuses_count"),
+        "media_count": legacy.get("media_count"),
+        "location": location,
+        "website_url": (urls[0].get("expanded_url") if urls else None) or legacy.get("url"),
+        "profile_language": None,
+    })
+
+
+class NetworkCapture:
+    """Read X's API responses (JSON) from Chrome's performance log.
+
+    The driver must be started with enable_capture(opts). With `record_dir`, every
+    captured response is also saved there as a JSON file (to replay it later offline).
+    With a SnapshotStore, responses are also saved there (kind "api", see reparse.py).
+    """
+
+    def __init__(self, driver, record_dir=None, store=None):
+        self.driver = driver
+        self.record_dir = record_dir
+        self.store = store
+        # responses seen in the log whose body is not loaded yet: requestId -> operation name
+        self._pending = {}
+        # captured responses nobody asked for yet (a profile() for another handle keeps them)
+        self._queue = []
+        # how many responses of each operation were captured so far (to wait for a page's own)
+        self._received = Counter()
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+    def drain(self):
+        # read the new log entries, and queue the API responses that finished loading
+        # (the body can only be read after Network.loadingFinished, not at responseReceived)
+        for entry in self.driver.get_log("performance"):
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = msg.get("method")
+            params = msg.get("params", {})
+            if method == "Network.responseReceived":
+                m = API_RE.search(params.get("response", {}).get("url", ""))
+                if m:
+                    self._pending[params.get("requestId")] = m.group(1)
+            elif method == "Network.loadingFailed":
+                self._pending.pop(params.get("requestId"), None)
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                op = self._pending.pop(params["requestId"])
+                try:
+                    body = self.driver.execute_cdp_cmd("Network.getResponseBody",
+                                                       {"requestId": params["requestId"]})
+                    payload = json.loads(body.get("body") or "")
+                except Exception:
+                    continue  # body gone or not JSON, skip it
+                self._record(op, payload)
+                self._queue.append((op, payload))
+                self._received[op] += 1
+        # keep only the newest responses, old unread ones are not needed any more
+        del self._queue[:-MAX_QUEUED]
+
+    def received(self, op):
+        # how many `op` responses were captured so far (reads the new log entries first)
+        self.drain()
+        return self._received[op]
+
+    def _take(self, wanted):
+        # take the queued responses that wanted(op, payload) accepts, keep the others
+        taken, kept = [], []
+        for item in self._queue:
+            (taken if wanted(*item) else kept).append(item)
+        self._queue = kept
+        return taken
+
+    def _record(self, op, payload):
+        if not self.record_dir and self.store is None:
+            return
+        text = json.dumps(payload, ensure_ascii=False)
+        if self.store is not None:
+            self.store.put("api", text, op=op)
+        if not self.record_dir:
+            return
+        name = f"{op}-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]}.json"
+        with open(os.path.join(self.record_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def tweets(self):
+        # new tweets from all timeline responses since the last call
+        self.drain()
+        out = []
+        for op, payload in self._take(lambda op, payload: op != "UserByScreenName"):
+            out += parse_tweets(payload)
+        return out
+
+    def profile(self, handle):
+        # the profile of `handle` if its response was captured, else None
+        # (responses of other profiles stay queued for their own call)
+        self.drain()
+
+        def is_handle(op, payload):
+            if op != "UserByScreenName":
+                return False
+            prof = parse_profile(payload)
+            return bool(prof) and (prof["username_handle"] or "").lower() == handle.lower()
+
+        found = self._take(is_handle)
+        return parse_profile(found[-1][1]) if found else None
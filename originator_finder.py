@@ -1,4 +1,62 @@
+import heapq
+from datetime import datetime, timezone
 import pandas as pd
+from csv_handler import CSVHandler
+from records import parse_counts
+
+# the fields of a tweet we give back for the originator
+FIELDS = ["user_handle", "profile_url", "tweet_id", "tweet_url", "post_time"]
+
+
+def _parse_time(value):
+    # Turn "2024-05-01T10:20:30.000Z" into a datetime (always with a timezone). None if not valid.
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _value(v):
+    # a cell of a pandas row, with empty cells (NaN, NA, NaT) as None
+    return None if v is None or pd.isna(v) else v
+
+
+class OriginatorTracker:
+    """Keep the k earliest tweets while tweets arrive, without storing all of them.
+
+    It uses a small heap of size k, so each tweet costs O(log k) and the memory
+    stays the same no matter how many tweets we see.
+    """
+
+    def __init__(self, k=1):
+        self.k = k
+        self._heap = []   # items: (-timestamp, -order, tweet fields), the latest one on top
+        self._order = 0   # so that on equal time the tweet seen first wins
+
+    def add(self, tweet):
+        dt = _parse_time(tweet.get("post_time"))
+        if dt is None:
+            return
+        self._order += 1
+        item = (-dt.timestamp(), -self._order, {f: tweet.get(f) for f in FIELDS})
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            # this tweet is earlier than the latest one we keep, so swap them
+            heapq.heapreplace(self._heap, item)
+
+    def top(self):
+        # the kept tweets, earliest first
+        return [fields for _, _, fields in sorted(self._heap, reverse=True)]
+
+    @property
+    def originator(self):
+        top = self.top()
+        return top[0] if top else None
+
 
 class OriginatorFinder:
     @staticmethod
@@ -6,20 +64,67 @@ class OriginatorFinder:
         # Change the "post_time" column into real date/time values
         s = pd.to_datetime(df["post_time"], errors="coerce")
 
-        # Add a new hidden column "_pt" with the date/time values
-        df = df.assign(_pt=s)
-
-        # Remove rows where "_pt" is empty or not valid
-        df = df.dropna(subset=["_pt"])
+        # Remove values that are empty or not valid (none left: no originator)
+        s = s.dropna()
+        if s.empty:
+            return None
 
-        # Sort the rows by time (oldest first), and pick the very first one
-        first = df.sort_values("_pt", ascending=True).iloc[0]
+        # Pick the row with the oldest time (no need to sort everything for one row)
+        first = df.loc[s.idxmin()]
 
         # Return the main details of that very first tweet
+        # (empty cells as None, not NaN)
         return {
-            "user_handle": first.get("user_handle"),  # the @username
-            "profile_url": first.get("profile_url"),  # link to the profile
-            "tweet_id": first.get("tweet_id"),        # tweet ID
-            "tweet_url": first.get("tweet_url"),      # link to the tweet
-            "post_time": first.get("post_time"),      # when it was posted
+            "user_handle": _value(first.get("user_handle")),  # the @username
+            "profile_url": _value(first.get("profile_url")),  # link to the profile
+            "tweet_id": _value(first.get("tweet_id")),        # tweet ID
+            "tweet_url": _value(first.get("tweet_url")),      # link to the tweet
+            "post_time": _value(first.get("post_time")),      # when it was posted
         }
+
+    @staticmethod
+    def find_originator_in_csv(filename="tweets.csv", chunksize=100_000):
+        # Same as find_originator, but reads the CSV file in parts (see earliest_in_csv)
+        top = OriginatorFinder.earliest_in_csv(filename, k=1, chunksize=chunksize)
+        return top[0] if top else None
+
+    @staticmethod
+    def earliest_in_csv(filename="tweets.csv", k=10, chunksize=100_000):
+        # For big CSV files: read the file in parts, so memory stays small,
+        # and keep only the k earliest tweets of every part.
+        tracker = OriginatorTracker(k)
+        for chunk in pd.read_csv(filename, usecols=FIELDS, dtype=str, chunksize=chunksize):
+            s = pd.to_datetime(chunk["post_time"], errors="coerce", utc=True)
+            chunk = chunk.assign(_pt=s).dropna(subset=["_pt"]).nsmallest(k, "_pt")
+            for row in chunk.to_dict("records"):
+                tracker.add({f: _value(row[f]) for f in FIELDS})  # empty cells as None, not NaN
+        return tracker.top()
+
+    @staticmethod
+    def top_authors(filename="tweets.csv", n=10, by="volume", chunksize=100_000):
+        # profile_urls of the n authors with most tweets (by="volume")
+        # or most likes + comments + reposts (by="engagement"), reading the CSV in parts
+        total = None
+        for chunk in pd.read_csv(filename, usecols=["profile_url", "likes", "comments", "reposts"],
+                                 dtype=str, chunksize=chunksize):
+            chunk = chunk.dropna(subset=["profile_url"])
+            if by == "engagement":
+                # counts as numbers with the same parser as the scrapers, summed in 64 bits
+                score = sum(parse_counts(chunk[c]).astype("Int64").fillna(0) for c in ("likes", "comments", "reposts"))
+                part = score.groupby(chunk["profile_url"]).sum()
+            else:
+                part = chunk.groupby("profile_url").size()
+            total = part if total is None else total.add(part, fill_value=0)
+        if total is None:
+            return []
+        return list(total.nlargest(n).index)
+
+    @staticmethod
+    def find_originator_in_parquet(filename="tweets.parquet"):
+        # post_time is already a timestamp in Parquet, and only the needed columns are read.
+        # The time is given back as text in the scraper's format, like the CSV functions do.
+        origin = OriginatorFinder.find_originator(CSVHandler.load_from_parquet(filename, columns=FIELDS))
+        if origin and isinstance(origin["post_time"], pd.Timestamp):
+            t = origin["post_time"].tz_convert("UTC")
+            origin["post_time"] = t.strftime("%Y-%m-%dT%H:%M:%S.") + f"{t.microsecond // 1000:03d}Z"
+        return origin
@@ -0,0 +1,87 @@
+import queue, threading
+from datetime import date
+from metrics import metrics
+from search_scraper import SearchScraper
+
+
+class PipelinedSearchScraper(SearchScraper):
+    """SearchScraper where scrolling and cleaning the tweets run at the same time.
+
+    The calling thread only scrolls and takes raw card values from the page (one
+    JavaScript call per scroll) into a bounded queue. Worker threads clean them
+    (numbers, hashtags, regexes) and write them. When the queue is full the
+    scrolling waits (backpressure). The scroll loop is SearchScraper.search_hashtag:
+    a tweet counts toward the limit only after a worker wrote it, so a tweet that
+    fails in a worker is not counted (and the search goes on for another one).
+    """
+
+    def __init__(self, driver, workers=2, queue_size=500, **kwargs):
+        super().__init__(driver, **kwargs)
+        self.workers = workers
+        self.queue_size = queue_size
+        self._queue = None  # set while a pipelined search runs
+
+    def _consume(self, q):
+        while True:
+            item = q.get()
+            try:
+                if item is None:
+                    return
+                run, tweet_id, (kind, value) = item
+                try:
+                    run.write(tweet_id, self._raw_to_dict(value) if kind == "raw" else value)
+                except Exception as e:
+                    run.drop(tweet_id)
+                    metrics.incr(f"pipeline.errors.{type(e).__name__}")
+            finally:
+                q.task_done()
+
+    def _page_items(self, batch=True):
+        # the new cards of the page: raw values (fast way), or cleaned dicts (slow Selenium way);
+        # only the ID is read here (to skip duplicates), the rest is done by the workers
+        if self._queue is None:
+            return super()._page_items(batch)
+        self._snapshot_cards()
+        raws = self._cards_raw()
+        if raws is not None:
+            items = []
+            for r in raws:
+                r["tweet_id"] = self._raw_id(r)
+                items.append((r["tweet_id"], ("raw", r)))
+            return items, 0
+        # slow Selenium way: the base class reads the cards, the workers only write them
+        items, failed = self._fallback_items()
+        return [(tweet_id, ("dict", d)) for tweet_id, d in items], failed
+
+    def _take(self, run, tweet_id, tweet):
+        if self._queue is None:
+            return super()._take(run, tweet_id, tweet)
+        with run.lock:
+            run.pending.add(tweet_id)
+        self._queue.put((run, tweet_id, tweet))  # waits here if the workers are behind
+
+    def _flush(self):
+        if self._queue is not None:
+            self._queue.join()
+
+    def search_hashtag(self, hashtag: str, limit: int | None = None, batch: bool = True, sink=None,
+                       since: date | None = None, until: date | None = None, index=None,
+                       max_id: int | None = None, stop=None):
+        # network capture already gives clean tweets, nothing to do in parallel
+        if self.capture is not None or not batch:
+            return super().search_hashtag(hashtag, limit, batch, sink, since, until, index, max_id, stop)
+
+        q = self._queue = queue.Queue(maxsize=self.queue_size)
+        threads = [threading.Thread(target=self._consume, args=(q,), daemon=True)
+                   for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        try:
+            return super().search_hashtag(hashtag, limit, batch, sink, since, until, index, max_id, stop)
+        finally:
+            # let the workers finish the queue, then stop them (the result is complete after this)
+            for _ in threads:
+                q.put(None)
+            for t in threads:
+                t.join()
+            self._queue = None
@@ -0,0 +1,86 @@
+import json, sqlite3, time
+
+
+class ProfileCache:
+    """Scraped profiles saved on disk (SQLite), so the same author is not scraped again and again.
+
+    Profiles are found by handle (the only thing we know before scraping one,
+    tweets give the author's handle), or by user_id (it stays the same when the handle changes).
+    A profile older than `ttl` seconds is stale: it is removed (an "eviction") and must be scraped again.
+    With ttl=0 every profile is stale. `clock` gives the current time (time.time, tests can pass their own).
+    """
+
+    def __init__(self, path="profiles_cache.db", ttl=24 * 3600, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = self.misses = self.evictions = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " handle TEXT PRIMARY KEY,"   # lower case, X handles are not case-sensitive
+            " user_id TEXT,"
+            " scraped_at REAL NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS profiles_user_id ON profiles(user_id)")
+        self.conn.commit()
+
+    def get(self, handle):
+        # fresh profile for this handle, or None
+        return self._get("handle", (handle or "").lower())
+
+    def get_by_user_id(self, user_id):
+        # fresh profile for this user ID, or None
+        return self._get("user_id", str(user_id or ""))
+
+    def _get(self, column, value):
+        if not value:
+            self.misses += 1
+            return None
+        row = self.conn.execute(
+            f"SELECT handle, scraped_at, data FROM profiles WHERE {column} = ? ORDER BY scraped_at DESC", (value,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        handle, scraped_at, data = row
+        if self.ttl <= 0 or self.clock() - scraped_at > self.ttl:
+            # too old: remove it, the caller scrapes a fresh one
+            self.conn.execute("DELETE FROM profiles WHERE handle = ?", (handle,))
+            self.conn.commit()
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(data)
+
+    def put(self, data):
+        handle = (data.get("username_handle") or "").lower()
+        if not handle:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO profiles (handle, user_id, scraped_at, data) VALUES (?, ?, ?, ?)",
+            (handle, data.get("user_id"), self.clock(), json.dumps(dict(data), ensure_ascii=False)),
+        )
+        self.conn.commit()
+
+    def purge(self):
+        # remove all stale profiles at once, gives back how many
+        cur = self.conn.execute("DELETE FROM profiles WHERE scraped_at < ?", (self.clock() - self.ttl,))
+        self.conn.commit()
+        self.evictions += cur.rowcount
+        return cur.rowcount
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0],
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
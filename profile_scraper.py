@@ -1,23 +1,37 @@
-import time, re, csv, os
+import csv, os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.webdriver.common.by import By
-from utils import safe_attr, safe_text, extract_first
+from metrics import metrics
+from records import PROFILE_COLUMNS, ProfileRecord, parse_count
+from utils import safe_attr, safe_text, extract_first, page_load_wait, element_present
+
 
 class ProfileScraper:
-    def __init__(self, driver, csv_file="profiles.csv"):
+    def __init__(self, driver, csv_file="profiles.csv", capture=None, snapshot=False, cache=None, store=None):
         self.driver = driver
+        # Optional SnapshotStore: the page HTML is saved to parse again later (reparse.py)
+        self.store = store
         self.csv_file = csv_file
+        # Optional ProfileCache: fresh profiles come from disk, without opening the page
+        self.cache = cache
+        # snapshot=True: take the page HTML once and read all fields from it (needs lxml)
+        self.snapshot = snapshot
+        # Optional NetworkCapture: read the profile from X's API response instead of the page
+        self.capture = capture
+        # Waits for the page instead of fixed sleeps (timeouts follow the real speed)
+        self.waiter = page_load_wait()
+
+        # csv_file=None: no CSV (scrape_many makes it once, before its threads start)
+        if self.csv_file is not None:
+            self.ensure_csv(self.csv_file)
 
+    @staticmethod
+    def ensure_csv(csv_file):
         # if CSV file does not exist, make a new one with headings
-        if not os.path.exists(self.csv_file):
-            with open(self.csv_file, "w", newline="", encoding="utf-8") as f:
+        if not os.path.exists(csv_file):
+            with open(csv_file, "w", newline="", encoding="utf-8") as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    "username_handle", "display_name", "user_id", "bio",
-                    "email", "phone", "address", "verification_status", "account_creation_date",
-                    "account_type", "protected_status", "followers_count",
-                    "following_count", "tweet_count", "media_count",
-                    "location", "website_url", "profile_language"
-                ])
+                writer.writerow(PROFILE_COLUMNS)
 
     # try to get one element, if not found, return None
     def _maybe(self, xpath):
@@ -31,22 +45,6 @@ class ProfileScraper:
         el = self._maybe(xpath)
         return safe_text(el) if el else None
 
-    # clean numbers like "2.5k" or "1.2M" into real numbers
-    def _extract_number(self, raw: str):
-        if not raw:
-            return None
-        raw = raw.lower().replace(",", "").strip()
-        match = re.search(r"([\d\.]+)([km]?)", raw)
-        if not match:
-            return None
-        num, suffix = match.groups()
-        num = float(num)
-        if suffix == "k":
-            num *= 1_000
-        elif suffix == "m":
-            num *= 1_000_000
-        return int(num)
-
     # get followers and following counts from profile stats
     def _stats(self):
         stats = {}
@@ -55,9 +53,9 @@ class ProfileScraper:
             for a in items:
                 lbl = a.get_attribute("aria-label") or a.text
                 if "Follower" in lbl:
-                    stats["followers_count"] = self._extract_number(lbl)
+                    stats["followers_count"] = parse_count(lbl)
                 elif "Following" in lbl:
-                    stats["following_count"] = self._extract_number(lbl)
+                    stats["following_count"] = parse_count(lbl)
         except:
             pass
         return stats
@@ -69,7 +67,7 @@ class ProfileScraper:
                 By.XPATH, f'//a[@role="tab" and .//span[text()="{tab_name}"]]'
             )
             aria = tab.get_attribute("aria-label") or tab.text
-            return self._extract_number(aria)
+            return parse_count(aria)
         except:
             return None
 
@@ -138,13 +136,135 @@ class ProfileScraper:
             return rid
         return extract_first(r'"id_str"\s*:\s*"(\d+)"', html)
 
+    # read all profile fields from saved page HTML (no browser needed, same dict as scrape_profile)
+    @staticmethod
+    def parse_html(html: str, profile_url: str):
+        try:
+            from lxml import html as lxml_html
+        except ImportError:
+            raise ImportError("Snapshot mode needs lxml, install it with: pip install lxml")
+
+        doc = lxml_html.fromstring(html)
+
+        def first(xpath):
+            found = doc.xpath(xpath)
+            return found[0] if found else None
+
+        def text(xpath):
+            el = first(xpath)
+            return el.text_content().strip() if el is not None else None
+
+        handle = profile_url.rstrip("/").split("/")[-1]
+        display_name = text('//div[@data-testid="UserName"]//span[1]')
+        bio = text('//div[@data-testid="UserDescription"]')
+
+        # joined date, location, website
+        join_date, location, website = None, None, None
+        for item in doc.xpath('//div[@data-testid="UserProfileHeader_Items"]//span'):
+            t = item.text_content().strip()
+            if t.startswith("Joined "):
+                join_date = t.replace("Joined", "").strip()
+            elif t.startswith("http") or "." in t:
+                website = t
+            else:
+                location = t
+        website = first('//a[@data-testid="UserUrl"]/@href') or website
+
+        # followers and following numbers
+        followers = following = None
+        for a in doc.xpath('//div[@data-testid="UserStats"]//a'):
+            lbl = a.get("aria-label") or a.text_content()
+            if "Follower" in lbl:
+                followers = parse_count(lbl)
+            elif "Following" in lbl:
+                following = parse_count(lbl)
+
+        # number of posts and media
+        def tab_count(name):
+            tab = first(f'//a[@role="tab" and .//span[text()="{name}"]]')
+            return parse_count(tab.get("aria-label") or tab.text_content()) if tab is not None else None
+
+        # verification, private/public, account type
+        verified = first('//div[@data-testid="UserName"]//*[contains(@aria-label,"Verified")]') is not None
+        protected = (first('//svg[@aria-label="Protected account"]') is not None
+                     or "This account is private" in html)
+        category = text('//div[@data-testid="UserProfessionalCategory"]')
+        user_id = (extract_first(r'"rest_id"\s*:\s*"(\d+)"', html)
+                   or extract_first(r'"id_str"\s*:\s*"(\d+)"', html))
+
+        return ProfileRecord.from_dict({
+            "username_handle": handle,
+            "display_name": display_name,
+            "user_id": user_id,
+            "bio": bio,
+            "email": extract_first(r'([\w\.-]+@[\w\.-]+\.\w+)', bio or ""),
+            "phone": extract_first(r'(\+?\d[\d\-\s]{7,}\d)', bio or ""),
+            "address": location,
+            "verification_status": "Verified" if verified else "Unverified",
+            "account_creation_date": join_date,
+            "account_type": "Business/Professional" if category else "Personal/Unknown",
+            "protected_status": "Private" if protected else "Public",
+            "followers_count": followers,
+            "following_count": following,
+            "tweet_count": tab_count("Posts"),
+            "media_count": tab_count("Media"),
+            "location": location,
+            "website_url": website,
+            "profile_language": first("//html/@lang"),
+        })
+
     # main method: open profile, collect all info, save to CSV
     def scrape_profile(self, profile_url: str, save=True):
-        self.driver.get(profile_url)
-        time.sleep(3)  # wait so page can load
+        if self.cache is not None:
+            cached = self.cache.get(profile_url.rstrip("/").split("/")[-1])
+            if cached:
+                metrics.incr("profile.cache_hits")
+                return ProfileRecord.from_dict(cached)
+        with metrics.timed("profile.scrape"):
+            return self._scrape_profile(profile_url, save)
+
+    def _scrape_profile(self, profile_url: str, save=True):
+        with metrics.timed("profile.page_load"):
+            # with network capture, X's answer (UserByScreenName) is enough, the header is not needed
+            answers = self.capture.received("UserByScreenName") if self.capture is not None else None
+            self.driver.get(profile_url)
+            # wait until the profile header is on the page (the other parts load with it)
+            header = element_present('//div[@data-testid="UserName"]')
+            loaded = header if answers is None else \
+                lambda d: header(d) or self.capture.received("UserByScreenName") > answers
+            # a timeout is not an empty profile: wait once more with the longest timeout, then give up
+            # with an error (a blank record must never be saved or cached as the profile)
+            if not self.waiter.until(self.driver, loaded) and \
+                    not self.waiter.until(self.driver, loaded, self.waiter.max_timeout):
+                metrics.incr("profile.not_loaded")
+                raise RuntimeError(f"Profile page did not load: {profile_url}")
 
         # break down info
         handle = profile_url.rstrip("/").split("/")[-1]
+
+        # one download of the page HTML, for the snapshot store and/or snapshot mode
+        html = None
+        if self.store is not None or self.snapshot:
+            html = self.driver.page_source
+            if self.store is not None:
+                self.store.put("profile", html, url=profile_url)
+
+        # with network capture, the API response already has every field
+        data = self.capture.profile(handle) if self.capture is not None else None
+        if data:
+            try:
+                data["profile_language"] = self.driver.find_element(By.TAG_NAME, "html").get_attribute("lang")
+            except:
+                pass
+            self._save(data, save)
+            return data
+
+        # snapshot mode: one page_source download, everything else is parsed offline
+        if self.snapshot:
+            data = self.parse_html(html, profile_url)
+            self._save(data, save)
+            return data
+
         display_name = self._maybe_text('//div[@data-testid="UserName"]//span[1]')
         bio = self._maybe_text('//div[@data-testid="UserDescription"]')
 
@@ -184,7 +304,7 @@ class ProfileScraper:
         user_id = self._user_id_from_source()
 
         # try to find email/phone in bio text
-        email = extract_first(r'[\w\.-]+@[\w\.-]+\.\w+', bio or "")
+        email = extract_first(r'([\w\.-]+@[\w\.-]+\.\w+)', bio or "")
         phone = extract_first(r'(\+?\d[\d\-\s]{7,}\d)', bio or "")
         address = location
 
@@ -194,8 +314,8 @@ class ProfileScraper:
         except:
             lang = None
 
-        # all data packed in a box (dict)
-        data = {
+        # all data packed in a box (a record, reads like a dict)
+        data = ProfileRecord.from_dict({
             "username_handle": handle,
             "display_name": display_name,
             "user_id": user_id,
@@ -214,12 +334,72 @@ class ProfileScraper:
             "location": location,
             "website_url": website,
             "profile_language": lang,
-        }
+        })
         
-        #save to csv with file handling 
+        self._save(data, save)
+        return data
+
+    #save to csv with file handling (and to the cache)
+    def _save(self, data, save=True):
+        if self.cache is not None:
+            self.cache.put(data)
+        if save:
+            self.save_rows([data])
+
+    # append many profiles to the CSV with one file open
+    def save_rows(self, rows):
+        metrics.incr("profile.rows_saved", len(rows))
         with open(self.csv_file, "a", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
-            writer.writerow(data.values())
+            writer.writerows(r.values() for r in rows)
 
-        return data
+    # scrape many profiles at the same time with browsers from a DriverPool (see browser.py)
+    @staticmethod
+    def scrape_many(profile_urls, pool, csv_file="profiles.csv", cache=None, snapshot=False, save=True):
+        # remove duplicates (handles are not case-sensitive), keep the order
+        urls, seen = [], set()
+        for url in profile_urls:
+            if not url:
+                continue
+            key = url.rstrip("/").split("/")[-1].lower()
+            if key not in seen:
+                seen.add(key)
+                urls.append(url)
+
+        # fresh profiles from the cache first, only the others need a browser
+        results = {}
+        if cache is not None:
+            for url in urls:
+                cached = cache.get(url.rstrip("/").split("/")[-1])
+                if cached:
+                    results[url] = cached
+        todo = [u for u in urls if u not in results]
+
+        # the CSV and its header are made here, once, not by every thread
+        if save:
+            ProfileScraper.ensure_csv(csv_file)
+
+        def one(url):
+            with pool.driver() as driver:
+                return ProfileScraper(driver, None, snapshot=snapshot).scrape_profile(url, save=False)
+
+        # as many threads as browsers in the pool, so no thread waits for a browser
+        with ThreadPoolExecutor(pool.size) as ex:
+            futures = {ex.submit(one, url): url for url in todo}
+            for fut in as_completed(futures):
+                try:
+                    results[futures[fut]] = fut.result()
+                except Exception as e:
+                    metrics.incr("profile.failed")
+                    print("[WARN] Profile failed:", futures[fut], e)
+                    continue
+                if cache is not None:
+                    cache.put(results[futures[fut]])  # only this thread uses the cache
+
+        profiles = [results[u] for u in urls if u in results]
+        scraped = [results[u] for u in todo if u in results]
+        if save and scraped:
+            # all new rows in one write (the header is already there)
+            ProfileScraper(None, csv_file).save_rows(scraped)
+        return profiles
 
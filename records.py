@@ -0,0 +1,120 @@
+# records.py
+"""Compact records for tweets and profiles, and the one parser for counts like "1.2K".
+
+TweetRecord / ProfileRecord keep their fields in __slots__ instead of a dict
+(a few times less memory per tweet on long runs), but read like a dict
+(record["likes"], record.get("likes"), dict(record)), so the CSV writer,
+the sinks and the trackers take them as they are.
+
+parse_count reads one count ("12", "3,400", "1.2K", "3.4M", "2B", "5.6K Followers"),
+parse_counts does the same for a column and gives a fixed-width integer column.
+Each different text is parsed once (with parse_count) and the numbers are spread
+back with numpy indexing: much faster on saved columns where the same few texts
+("1.2K", "0", "") come back again and again, no faster than parse_count when
+every text is different (see the parse_counts_unique numbers of benchmark.py).
+"""
+import re
+from collections.abc import Mapping
+
+TWEET_COLUMNS = [
+    "tweet_url","tweet_id","user_handle","profile_url",
+    "content","hashtags","post_time","scrape_time",
+    "likes","comments","reposts","views"
+]
+
+# columns of profiles.csv (same order as the dict of scrape_profile)
+PROFILE_COLUMNS = [
+    "username_handle", "display_name", "user_id", "bio",
+    "email", "phone", "address", "verification_status", "account_creation_date",
+    "account_type", "protected_status", "followers_count",
+    "following_count", "tweet_count", "media_count",
+    "location", "website_url", "profile_language"
+]
+
+# Fixed-width integer types of the counts (nullable: a missing button stays empty).
+# 32 bits is enough for likes and followers, views can go over 4 billion.
+COUNT_DTYPES = {
+    "likes": "UInt32", "comments": "UInt32", "reposts": "UInt32", "views": "UInt64",
+    "followers_count": "UInt32", "following_count": "UInt32",
+    "tweet_count": "UInt32", "media_count": "UInt32",
+}
+
+# first number of the text, with an optional K/M/B right after it
+# ("321 media" is 321, not 321 million: the suffix must not start a word)
+COUNT_PATTERN = r"(\d[\d,]*(?:\.\d+)?)([KMB](?![A-Z]))?"
+_COUNT_RE = re.compile(COUNT_PATTERN, re.IGNORECASE)
+_SUFFIX = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+
+def parse_count(text):
+    """Turn text like '12,345' or '1.2K' or '3.4M' or '2B' into a number. If not possible, give None."""
+    if text is None:
+        return None
+    m = _COUNT_RE.search(str(text))
+    if not m:
+        return None
+    num = float(m.group(1).replace(",", ""))
+    if m.group(2):
+        num *= _SUFFIX[m.group(2).upper()]
+    return int(round(num))
+
+
+def parse_counts(values, dtype="UInt32"):
+    """parse_count for a whole column (list or Series), as a nullable fixed-width int Series.
+
+    Numbers that do not fit in `dtype` are empty (NA), like texts that are not a count.
+    """
+    # numpy and pandas only here: the scrapers and utils import this module for parse_count
+    import numpy as np
+    import pandas as pd
+    s = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    # codes: index of each value in `uniques` (-1 for empty), one pass in C
+    codes, uniques = pd.factorize(s)
+    nums = [parse_count(u) for u in uniques]
+    # slot 0 is for the empty values, so codes + 1 picks the right number
+    table = np.array([np.nan] + [np.nan if n is None else n for n in nums], dtype="float64")
+    # a number too big for the dtype ("4.3B" likes in UInt32) stays empty instead of failing the column
+    table[table > np.iinfo(dtype.lower()).max] = np.nan
+    return pd.Series(table[codes + 1], index=s.index).astype(dtype)
+
+
+class _Record(Mapping):
+    """Fields in __slots__ (no dict per record), read and written like a dict."""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, data):
+        # keys that are not fields are dropped
+        return cls(**{k: data.get(k) for k in cls.__slots__})
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)})"
+
+
+class TweetRecord(_Record):
+    __slots__ = tuple(TWEET_COLUMNS)
+
+
+class ProfileRecord(_Record):
+    __slots__ = tuple(PROFILE_COLUMNS)
@@ -0,0 +1,103 @@
+# reparse.py
+"""Turn a snapshot archive (see snapshot_store.py) into tweet and profile CSVs, without a browser.
+
+    python reparse.py snapshots --tweets tweets_reparsed.csv --profiles profiles_reparsed.csv
+
+The snapshots are parsed in a pool of processes (one per CPU by default), so
+after fixing an XPath we can extract everything again on all cores.
+"""
+import argparse, csv, json, os
+from multiprocessing import Pool
+from urllib.parse import urlparse
+
+from csv_handler import CSVHandler
+from profile_scraper import PROFILE_COLUMNS
+from snapshot_store import SnapshotStore
+
+
+def _snapshot_time(entry):
+    # when the snapshot was taken, in the same format as scrape_time (utils.now_iso)
+    from datetime import datetime, timezone
+    from utils import ISO
+    t = entry.get("time")
+    return datetime.fromtimestamp(t, timezone.utc).strftime(ISO) if t is not None else None
+
+
+def _parse(job):
+    # runs in a worker process: one snapshot -> ("tweets", [...]) or ("profiles", [...]),
+    # and False as third value when the snapshot could not be read or parsed
+    from network_capture import parse_tweets, parse_profile
+    from profile_scraper import ProfileScraper
+    from search_scraper import SearchScraper
+
+    root, entry = job
+    url = entry.get("url") or "https://x.com/"
+    base = "{0.scheme}://{0.netloc}".format(urlparse(url)) if "://" in url else "https://x.com"
+    try:
+        content = SnapshotStore(root).get(entry["hash"])
+        if entry["kind"] == "profile":
+            return "profiles", [ProfileScraper.parse_html(content, url)], True
+        if entry["kind"] == "api" and entry.get("op") == "UserByScreenName":
+            prof = parse_profile(json.loads(content))
+            return "profiles", [prof] if prof else [], True
+        if entry["kind"] == "api":
+            tweets = parse_tweets(json.loads(content))
+        elif entry["kind"] == "search":
+            tweets = SearchScraper.parse_cards_html(content, base)
+        else:
+            return "tweets", [], True
+        # the tweets were scraped when the snapshot was taken, not now
+        scraped = _snapshot_time(entry)
+        for t in tweets:
+            t["scrape_time"] = scraped or t["scrape_time"]
+        return "tweets", tweets, True
+    except Exception as e:
+        print(f"[WARN] Snapshot {entry['hash'][:12]} failed:", e)
+    return "tweets", [], False
+
+
+def reparse(root="snapshots", tweets_csv="tweets_reparsed.csv", profiles_csv="profiles_reparsed.csv",
+            workers=None, kinds=None):
+    store = SnapshotStore(root)
+    jobs = [(root, e) for e in store.entries() if not kinds or e["kind"] in kinds]
+    profiles = {}   # handle -> profile (a later snapshot replaces an earlier one)
+    failed = 0      # snapshots that could not be read or parsed
+
+    with CSVHandler.open_stream(tweets_csv) as sink, Pool(workers or os.cpu_count()) as pool:
+        # imap keeps the manifest order, so "later snapshot wins" is true for profiles
+        for kind, records, ok in pool.imap(_parse, jobs, chunksize=8):
+            failed += not ok
+            for r in records:
+                if kind == "profiles":
+                    profiles[(r.get("username_handle") or "").lower()] = r
+                elif r["tweet_id"] not in sink.seen_ids:
+                    sink.write(r)
+
+    with open(profiles_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(PROFILE_COLUMNS)
+        writer.writerows([p.get(c) for c in PROFILE_COLUMNS] for p in profiles.values())
+    return sink.count, len(profiles), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a snapshot archive again, without a browser.")
+    parser.add_argument("root", nargs="?", default="snapshots", help="Snapshot folder (default: snapshots)")
+    parser.add_argument("-t", "--tweets", default="tweets_reparsed.csv",
+                        help="Output CSV for tweets (default: tweets_reparsed.csv)")
+    parser.add_argument("-p", "--profiles", default="profiles_reparsed.csv",
+                        help="Output CSV for profiles (default: profiles_reparsed.csv)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Number of processes (default: one per CPU)")
+    parser.add_argument("-k", "--kind", nargs="+", choices=["search", "profile", "api"], default=None,
+                        help="Only these kinds of snapshots (default: all)")
+    args = parser.parse_args()
+
+    n_tweets, n_profiles, failed = reparse(args.root, args.tweets, args.profiles, args.workers, args.kind)
+    print(f"[OK] {n_tweets} tweets -> {args.tweets}, {n_profiles} profiles -> {args.profiles}")
+    if failed:
+        print(f"[WARN] {failed} snapshots could not be read or parsed")
+
+
+if __name__ == "__main__":
+    main()
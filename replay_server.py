@@ -0,0 +1,69 @@
+# replay_server.py
+"""A local stand-in for x.com that replays recorded API responses (for offline runs).
+
+Record responses with NetworkCapture(driver, record_dir="recorded"), then run
+`python replay_server.py recorded` and point the scrapers at http://127.0.0.1:8765
+(SearchScraper(driver, base_url=...), profile URLs like http://127.0.0.1:8765/<handle>).
+Every page loads the recorded JSON files of its kind with fetch(), at the same
+/i/api/graphql/<id>/<Operation> paths as X, so NetworkCapture sees them like the real ones.
+Search operators (since:, until:, max_id:) are not applied, every search gets the same
+responses; benchmark.py has a stand-in server that answers them.
+"""
+import argparse, json, os
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+PAGE = """<!doctype html><html lang="en"><body><script>
+for (const name of %s) fetch('/i/api/graphql/replay/' + name.split('-')[0] + '?file=' + encodeURIComponent(name));
+</script></body></html>"""
+
+
+def make_handler(record_dir):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, body, ctype):
+            data = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _files(self, op):
+            return sorted(f for f in os.listdir(record_dir) if f.startswith(op + "-"))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.startswith("/i/api/graphql/"):
+                # one recorded response file
+                name = os.path.basename(url.query.partition("file=")[2])
+                path = os.path.join(record_dir, name)
+                if not os.path.isfile(path):
+                    return self._send(404, "{}", "application/json")
+                with open(path, "r", encoding="utf-8") as f:
+                    return self._send(200, f.read(), "application/json")
+            # a search page or a profile page
+            op = "SearchTimeline" if url.path == "/search" else "UserByScreenName"
+            files = self._files(op)
+            if op == "UserByScreenName":
+                files += self._files("UserTweets")
+            self._send(200, PAGE % json.dumps(files), "text/html")
+
+        def log_message(self, *args):
+            pass  # keep the console quiet
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded X API responses on a local server.")
+    parser.add_argument("record_dir", help="Folder with the recorded JSON files")
+    parser.add_argument("-p", "--port", type=int, default=8765, help="Port (default: 8765)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.record_dir))
+    print(f"[OK] Replaying {args.record_dir} on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
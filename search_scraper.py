@@ -1,28 +1,159 @@
-import time, re
+import threading, time, re
+from datetime import date, timedelta
+from urllib.parse import quote
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import StaleElementReferenceException
-from utils import now_iso, parse_int_maybe, extract_first, gen_tweet_id
+from metrics import metrics
+from records import TweetRecord, parse_counts
+from utils import (now_iso, parse_int_maybe, extract_first, gen_tweet_id, AdaptiveWait, page_load_wait,
+                   page_height, page_block, RateLimited)
 
 # This is the URL pattern for Twitter/X live search
 # {tag} will be replaced with the hashtag we want to search
 LIVE_URL = "https://x.com/search?q=%23{tag}&src=typed_query&f=live"
 
+# Same live search, but {query} can have date operators like "since:2024-01-01 until:2024-02-01"
+# ("until" day is not included). {base} is "https://x.com" or a local stand-in server.
+WINDOW_URL = "{base}/search?q={query}&src=typed_query&f=live"
+
+# The first day that can have tweets (Twitter started in March 2006)
+FIRST_DAY = date(2006, 3, 21)
+
+# One JavaScript call that reads every tweet card on the page at once.
+# It gives back plain raw values (strings), and Python cleans them up after.
+# This is much faster than asking Selenium for each field of each card,
+# because every Selenium call is one HTTP round-trip to the browser.
+# Cards we already read get a "data-scraped" mark, so the next scroll only
+# reads the new cards (not the whole page again).
+# Cards without a status link (ads, cards still loading) are skipped until they have
+# one: without the link there is no tweet ID, and each scroll would give them a new fake one.
+CARDS_JS = """
+const out = [];
+for (const t of document.querySelectorAll('article[data-testid="tweet"]:not([data-scraped])')) {
+  const a = Array.from(t.querySelectorAll('a[href*="/status/"]')).find(x => x.querySelector('time'));
+  if (!a) continue;
+  const raw = {tweet_url: a.href, post_time: a.querySelector('time').getAttribute('datetime'),
+               profile_url: null, content: null, reply: null, retweet: null, like: null};
+  t.setAttribute('data-scraped', '1');
+  const user = t.querySelector('div[data-testid="User-Name"] a');
+  if (user) raw.profile_url = user.href;
+  const text = t.querySelector('div[data-testid="tweetText"]');
+  if (text) raw.content = text.innerText;
+  for (const id of ['reply', 'retweet', 'like']) {
+    const b = t.querySelector('button[data-testid="' + id + '"]');
+    if (b) raw[id] = b.innerText || b.getAttribute('aria-label') || '';
+  }
+  out.push(raw);
+}
+return out;
+"""
+
+# XPath for the slow way: only cards without the "data-scraped" mark
+NEW_CARDS_XPATH = '//article[@data-testid="tweet" and not(@data-scraped)]'
+
+# HTML of the cards not read yet (for the snapshot store), only the ones with their status link
+CARDS_HTML_JS = """
+return Array.from(document.querySelectorAll('article[data-testid="tweet"]:not([data-scraped])'))
+  .filter(t => t.querySelector('a[href*="/status/"] time'))
+  .map(t => t.outerHTML).join('\\n');
+"""
+
+# Something to read on the page: a tweet card, or the "no results" box
+TWEET_XPATH = '//article[@data-testid="tweet"]'
+EMPTY_XPATH = '//div[@data-testid="emptyState"]'
+READY_XPATH = TWEET_XPATH + " | " + EMPTY_XPATH
+
+# How many times a date window page is opened before we give up on it (find_earliest_window)
+WINDOW_TRIES = 3
+
+# How many loaded cards (with their tweet link) we did not read yet
+UNREAD_JS = """
+return Array.from(document.querySelectorAll('article[data-testid="tweet"]:not([data-scraped])'))
+  .filter(t => t.querySelector('a[href*="/status/"] time')).length;
+"""
+
+class SearchRun:
+    """What one search_hashtag call has written so far.
+
+    A tweet counts (found, seen_ids, index, oldest_id) only once it is written, so a
+    tweet that fails on its way (in a pipeline worker) is not counted toward the limit.
+    `pending` has the IDs handed to workers and not written yet.
+    """
+
+    def __init__(self, sink=None, index=None):
+        self.sink = sink
+        self.index = index
+        self.seen_ids = sink.seen_ids if sink is not None else set()
+        self.out = []           # the tweets, when there is no sink
+        self.found = 0          # new tweets written in this run
+        self.oldest_id = None   # oldest tweet ID written (to continue after a reload)
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def write(self, tweet_id, tweet):
+        with self.lock:
+            if self.sink is not None:
+                self.sink.write(tweet)
+            else:
+                self.out.append(tweet)
+            self.seen_ids.add(tweet_id)
+            if self.index is not None:
+                self.index.add(tweet_id)
+            self.found += 1
+            self.oldest_id = SearchScraper._older(self.oldest_id, tweet_id)
+            self.pending.discard(tweet_id)
+
+    def drop(self, tweet_id):
+        # the tweet failed on its way: not written, not counted (a later card may have it again)
+        with self.lock:
+            self.pending.discard(tweet_id)
+
+
 class SearchScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, base_url="https://x.com", capture=None, store=None,
+                 recycle_mb=None, recycle_scrolls=None, throttle=None):
         # Save the web browser driver (like Chrome)
         self.driver = driver
+        # Optional NetworkCapture: read tweets from X's API responses instead of the page
+        self.capture = capture
+        # Waits for the page instead of fixed sleeps (timeouts follow the real speed).
+        # Page loads and scrolls learn their own timeouts: a fast scroll must not
+        # shorten the wait for a whole new page.
+        self.page_waiter = page_load_wait()
+        self.scroll_waiter = AdaptiveWait()
+        # Optional SnapshotStore: raw HTML of the cards is saved to parse again later (reparse.py)
+        self.store = store
+        # Long runs: reload the search (from the oldest tweet we have) when the page
+        # uses more than recycle_mb of JS memory, or after recycle_scrolls scrolls
+        self.recycle_mb = recycle_mb
+        self.recycle_scrolls = recycle_scrolls
+        self._perf_enabled = False  # DevTools performance metrics turned on (see _page_memory)
+        # Where the search pages come from (change it to use a local stand-in server)
+        self.base_url = base_url.rstrip("/")
+        # Optional session of a SessionPool: waits before every page load and scroll,
+        # so the account stays under its request rate
+        self.throttle = throttle
+
+    def _search_url(self, hashtag, since=None, until=None, max_id=None):
+        # Build the live search URL, with optional date window
+        # (max_id: only tweets with this ID or older, used to continue after a reload)
+        tag = hashtag.lstrip("#")
+        if since is None and until is None and max_id is None and self.base_url == "https://x.com":
+            return LIVE_URL.format(tag=tag)
+        query = f"#{tag}"
+        if since:
+            query += f" since:{since.isoformat()}"
+        if until:
+            query += f" until:{until.isoformat()}"
+        if max_id:
+            query += f" max_id:{max_id}"
+        return WINDOW_URL.format(base=self.base_url, query=quote(query, safe=""))
 
     def _tweet_to_dict(self, t):
-        # This function takes one tweet card (t) and turns it into a dictionary (a data object)
+        # This function takes one tweet card (t) and turns it into a record (reads like a dict)
         # It collects tweet link, user handle, text, likes, replies, etc.
-        data = {
-            "tweet_url": None, "tweet_id": None,
-            "user_handle": None, "profile_url": None,
-            "content": None, "hashtags": None,
-            "post_time": None, "scrape_time": now_iso(),
-            "likes": None, "comments": None, "reposts": None
-        }
+        data = TweetRecord(scrape_time=now_iso())
 
         # Get tweet URL, ID, and time
         try:
@@ -68,9 +199,9 @@ class SearchScraper:
             try:
                 node = t.find_element(By.XPATH, f'.//button[@data-testid="{testid}"]')
                 txt = node.text or node.get_attribute("aria-label") or ""
-                return parse_int_maybe(extract_first(r"([\d,\.KMB]+)", txt))
             except Exception:
                 return None
+            return SearchScraper._button_count(txt)
 
         # Get stats for comments, reposts, likes
         data["comments"] = stat_try("reply")
@@ -80,51 +211,439 @@ class SearchScraper:
 
         return data
 
-    def search_hashtag(self, hashtag: str, limit: int | None = None):
+    @staticmethod
+    def _raw_to_dict(raw, stats=True):
+        # Same fields as _tweet_to_dict, but built from the raw values of CARDS_JS
+        # (stats=False: the counts are left empty, to parse them for many cards at once)
+        data = TweetRecord(tweet_url=raw.get("tweet_url"), post_time=raw.get("post_time"), scrape_time=now_iso())
+
+        # Tweet ID from the URL, or a fake one if there is no URL (maybe already found, see _raw_id)
+        data["tweet_id"] = raw.get("tweet_id") or SearchScraper._raw_id(raw)
+
+        # User handle and profile link
+        profile = raw.get("profile_url")
+        if profile:
+            data["profile_url"] = profile
+            handle = profile.rstrip("/").split("/")[-1]
+            data["user_handle"] = handle if "user/" not in profile else None
+
+        # Tweet text and hashtags
+        content = raw.get("content")
+        if content is not None:
+            data["content"] = content
+            data["hashtags"] = ";".join([w for w in content.split() if w.startswith("#")])
+
+        # Stats: the raw text of the buttons, or None if the button was missing
+        if stats:
+            data["comments"] = SearchScraper._button_count(raw.get("reply"))
+            data["reposts"]  = SearchScraper._button_count(raw.get("retweet"))
+            data["likes"]    = SearchScraper._button_count(raw.get("like"))
+
+        return data
+
+    @staticmethod
+    def _button_count(text):
+        # the count of a stat button: None when the button is missing, 0 when it has
+        # no number (X shows only "Reply" / "Like" for a zero count)
+        if text is None:
+            return None
+        n = parse_int_maybe(text)
+        return 0 if n is None else n
+
+    @staticmethod
+    def _raw_id(raw):
+        return extract_first(r"status/(\d+)", raw.get("tweet_url")) or gen_tweet_id()
+
+    def _snapshot_cards(self):
+        # save the HTML of the cards we are about to read (before they get the "data-scraped" mark)
+        if self.store is None or self.capture is not None:
+            return
+        try:
+            html = self.driver.execute_script(CARDS_HTML_JS)
+        except Exception:
+            return
+        if html:
+            self.store.put("search", html, url=self.driver.current_url)
+
+    @staticmethod
+    def parse_cards_html(html, base_url="https://x.com"):
+        """Tweets from saved card HTML (see CARDS_HTML_JS), same dicts as search_hashtag. Needs lxml."""
+        from urllib.parse import urljoin
+        try:
+            from lxml import html as lxml_html
+        except ImportError:
+            raise ImportError("Parsing snapshots needs lxml, install it with: pip install lxml")
+
+        raws = []
+        for t in lxml_html.fromstring(f"<div>{html}</div>").xpath('.//article[@data-testid="tweet"]'):
+            raw = {"tweet_url": None, "post_time": None, "profile_url": None, "content": None,
+                   "reply": None, "retweet": None, "like": None}
+            links = t.xpath('.//a[contains(@href,"/status/")][.//time]')
+            if not links:
+                continue  # no status link (ad, card still loading): no tweet to read, like CARDS_JS
+            raw["tweet_url"] = urljoin(base_url, links[0].get("href"))
+            raw["post_time"] = links[0].xpath(".//time")[0].get("datetime")
+            user = t.xpath('.//div[@data-testid="User-Name"]//a')
+            if user:
+                raw["profile_url"] = urljoin(base_url, user[0].get("href"))
+            text = t.xpath('.//div[@data-testid="tweetText"]')
+            if text:
+                raw["content"] = text[0].text_content()
+            for key in ("reply", "retweet", "like"):
+                b = t.xpath(f'.//button[@data-testid="{key}"]')
+                if b:
+                    raw[key] = b[0].text_content().strip() or b[0].get("aria-label") or ""
+            raws.append(raw)
+        return SearchScraper.raws_to_records(raws)
+
+    @staticmethod
+    def raws_to_records(raws):
+        # Many raw cards at once (offline reparse): the counts of each button are
+        # parsed as one column (see records.parse_counts): each different text only once
+        out = [SearchScraper._raw_to_dict(r, stats=False) for r in raws]
+        for key, field in (("reply", "comments"), ("retweet", "reposts"), ("like", "likes")):
+            counts = parse_counts([r.get(key) for r in raws]).tolist()
+            for rec, r, n in zip(out, raws, counts):
+                if isinstance(n, int):
+                    rec[field] = n
+                else:
+                    # <NA>: a button without a number is 0 (see _button_count), a missing
+                    # button or a number too big for the column stays None
+                    text = r.get(key)
+                    rec[field] = 0 if text is not None and parse_int_maybe(text) is None else None
+        return out
+
+    def _cards_raw(self):
+        # Read all visible tweet cards with one execute_script call (raw values, not cleaned).
+        # Returns None if the script fails, so the caller can fall back to Selenium.
+        try:
+            raws = self.driver.execute_script(CARDS_JS)
+        except Exception:
+            return None
+        return raws if isinstance(raws, list) else None
+
+    def _mark_scraped(self, card, data):
+        # Put the "data-scraped" mark on a card read the slow way.
+        # Cards without a tweet link are not fully loaded yet, so we read them again later.
+        if not data.get("tweet_url"):
+            return
+        try:
+            self.driver.execute_script("arguments[0].setAttribute('data-scraped', '1');", card)
+        except Exception:
+            pass
+
+    def _record_scroll(self, extract_start, seen, new, duplicates, failed):
+        # numbers of one scroll: time to read the cards, and what happened to them
+        metrics.add_time("search.extract", time.perf_counter() - extract_start)
+        metrics.incr("search.scrolls")
+        metrics.incr("search.cards.seen", seen)
+        metrics.incr("search.cards.new", new)
+        metrics.incr("search.cards.duplicate", duplicates)
+        metrics.incr("search.cards.failed", failed)
+        metrics.record("search.scroll", seen=seen, new=new, duplicate=duplicates, failed=failed)
+
+    def _pace(self):
+        if self.throttle is not None:
+            self.throttle.wait()
+
+    def _open_search(self, hashtag, since=None, until=None, max_id=None):
+        # Open the live search page, wait until the first tweets (or "no results") are there
+        self._pace()
+        with metrics.timed("search.page_load"):
+            # with network capture, the page is ready when X answered its search (SearchTimeline)
+            answers = self.capture.received("SearchTimeline") if self.capture is not None else None
+            self.driver.get(self._search_url(hashtag, since, until, max_id))
+            # a timeout is not an empty result: wait once more with the longest timeout,
+            # then give up with an error (never scrape a page that did not load as "no tweets")
+            if not self._wait_ready(answers=answers) and not self._wait_ready(self.page_waiter.max_timeout, answers):
+                raise RuntimeError(f"Search page did not load: {self.driver.current_url}")
+        return self.driver.find_element(By.TAG_NAME, "body")
+
+    @staticmethod
+    def _older(oldest_id, tweet_id):
+        # the smaller (older) of two tweet IDs, fake (non-number) IDs are ignored
+        if not str(tweet_id).isdigit():
+            return oldest_id
+        return int(tweet_id) if oldest_id is None else min(oldest_id, int(tweet_id))
+
+    def _needs_recycle(self, scrolls):
+        # True when the page got too big: too many scrolls, or too much JS memory
+        # (memory is checked every 10 scrolls, it costs one or two more round-trips)
+        if self.recycle_scrolls and scrolls >= self.recycle_scrolls:
+            return True
+        if self.recycle_mb and scrolls and scrolls % 10 == 0:
+            used, nodes = self._page_memory()
+            if used is None:
+                return False
+            metrics.record("search.heap_mb", scrolls=scrolls, mb=round(used / 2**20, 1), nodes=nodes)
+            return used > self.recycle_mb * 2**20
+        return False
+
+    def _page_memory(self):
+        # (JS heap bytes, DOM nodes) of the page, (None, None) when it can not be read.
+        # DevTools' Performance.getMetrics is exact; performance.memory (fallback, without
+        # DevTools) is rounded and cached by Chrome, so it can grow late.
+        try:
+            if not self._perf_enabled:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
+                self._perf_enabled = True
+            got = {m["name"]: m["value"] for m in
+                   self.driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])}
+            return got.get("JSHeapUsedSize", 0), got.get("Nodes")
+        except Exception:
+            pass
+        try:
+            return self.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0"
+            ) or 0, None
+        except Exception:
+            return None, None
+
+    def _recycle(self, hashtag, since, until, oldest_id):
+        # Reload the search so Chrome frees the old page, and go on from the oldest tweet we have
+        # (everything newer is already scraped; seen_ids still skips any repeat)
+        metrics.incr("search.recycles")
+        return self._open_search(hashtag, since, until, max_id=oldest_id - 1)
+
+    def _wait_ready(self, timeout=None, answers=None):
+        # True when tweets or "no results" are there, RateLimited on a rate-limit or login page
+        # (answers: SearchTimeline responses captured before the page load, a new one also counts)
+        def ready(d):
+            if d.find_elements(By.XPATH, READY_XPATH):
+                return True
+            if answers is not None and self.capture.received("SearchTimeline") > answers:
+                return True
+            kind = page_block(d)
+            if kind:
+                metrics.incr(f"search.blocked.{kind}")
+                raise RateLimited(kind)
+            return False
+        return self.page_waiter.until(self.driver, ready, timeout)
+
+    def _check_blocked(self, stagnant_scrolls, out, oldest_id):
+        # every 4 scrolls without new tweets: is it really the end, or a rate-limit / login page?
+        # (then the result is not complete, so we raise instead of returning it)
+        if stagnant_scrolls and stagnant_scrolls % 4 == 0:
+            kind = page_block(self.driver)
+            if kind:
+                metrics.incr(f"search.blocked.{kind}")
+                raise RateLimited(kind, out, oldest_id)
+
+    def _more_loaded(self, last_height):
+        # condition after a scroll: the page grew, or there are cards we did not read yet
+        # (with network capture there are no marks, so only the height counts)
+        def check(d):
+            if page_height(d) > last_height:
+                return True
+            return self.capture is None and d.execute_script(UNREAD_JS) > 0
+        return check
+
+    def _scroll(self, body, stagnant_scrolls):
+        # Scroll to the end of the page and wait until more is loaded (or timeout).
+        # Before the last stagnant scroll ends the run, wait the longest timeout:
+        # a slow answer is not the end of the timeline.
+        self._pace()
+        with metrics.timed("search.scroll"):
+            last_height = page_height(self.driver)
+            body.send_keys(Keys.END)
+            self.scroll_waiter.until(self.driver, self._more_loaded(last_height),
+                                     self.scroll_waiter.max_timeout if stagnant_scrolls == 3 else None)
+
+    def _window_has_tweets(self, hashtag, since, until, timeout=None):
+        # Open the search for one date window and check if it shows any tweet:
+        # True for tweet cards, False for the "no results" box, None when neither came
+        # before the timeout (a slow page is not an empty window, we just don't know)
+        self._pace()
+        self.driver.get(self._search_url(hashtag, since, until))
+        if not self._wait_ready(timeout):
+            return None
+        if self.driver.find_elements(By.XPATH, TWEET_XPATH):
+            return True
+        if self.driver.find_elements(By.XPATH, EMPTY_XPATH):
+            return False
+        return None
+
+    def _window_state(self, hashtag, since, until):
+        # _window_has_tweets, asked again with the longest timeout while the answer is unknown
+        for attempt in range(WINDOW_TRIES):
+            state = self._window_has_tweets(hashtag, since, until,
+                                            None if attempt == 0 else self.page_waiter.max_timeout)
+            if state is not None:
+                return state
+            metrics.incr("search.window_unknown")
+        raise RuntimeError(f"Could not tell if {since} -> {until} has tweets (the page did not load)")
+
+    def find_earliest_window(self, hashtag: str, start: date | None = None, end: date | None = None):
+        """Find the first day that has tweets for the hashtag, with a binary search on dates.
+
+        Each step opens one search page for half of the remaining days, so it needs
+        about log2(days) page loads (around 13 for all years since 2006).
+        Returns (since, until) of that one day, or None if there are no tweets at all.
+        Raises RuntimeError when a window page does not load after WINDOW_TRIES tries
+        (taking it as empty would give a wrong day).
+        """
+        lo = start or FIRST_DAY
+        hi = end or date.today() + timedelta(days=1)
+        if not self._window_state(hashtag, lo, hi):
+            return None
+
+        # we know [lo, hi) has tweets; keep the earlier half if it has tweets, else the later half
+        while (hi - lo).days > 1:
+            mid = lo + timedelta(days=(hi - lo).days // 2)
+            if self._window_state(hashtag, lo, mid):
+                hi = mid
+            else:
+                lo = mid
+        return lo, hi
+
+    def search_originator(self, hashtag: str, start: date | None = None, end: date | None = None,
+                          batch: bool = True, sink=None):
+        # Scrape only the earliest day with tweets, instead of scrolling the whole timeline
+        window = self.find_earliest_window(hashtag, start, end)
+        if window is None:
+            return []
+        since, until = window
+        return self.search_hashtag(hashtag, batch=batch, sink=sink, since=since, until=until)
+
+    def _page_items(self, batch=True):
+        # the new tweets of the page as (tweet_id, tweet) pairs, and how many cards failed
+        self._snapshot_cards()
+        if self.capture is not None:
+            # Network way: tweets from the API responses (exact IDs, times and counts)
+            return [(d["tweet_id"], d) for d in self.capture.tweets()], 0
+
+        # Fast way: read all cards with one JavaScript call, then clean them here
+        raws = self._cards_raw() if batch else None
+        if raws is not None:
+            items, failed = [], 0
+            for r in raws:
+                try:
+                    d = self._raw_to_dict(r)
+                    items.append((d["tweet_id"], d))
+                except Exception as e:
+                    failed += 1
+                    metrics.incr(f"search.errors.{type(e).__name__}")
+            return items, failed
+
+        return self._fallback_items()
+
+    def _fallback_items(self):
+        # Slow way (fallback): find the new tweet cards and read them one by one
+        metrics.incr("search.fallback_scrolls")
+        items, failed = [], 0
+        for c in self.driver.find_elements(By.XPATH, NEW_CARDS_XPATH):
+            try:
+                d = self._tweet_to_dict(c)
+                if not d.get("tweet_url"):
+                    continue  # not loaded yet (no status link), read again after the next scroll
+                self._mark_scraped(c, d)
+                items.append((d["tweet_id"], d))
+            except StaleElementReferenceException:
+                # Tweet disappeared (page updated), skip it
+                failed += 1
+                metrics.incr("search.errors.StaleElementReferenceException")
+            except Exception as e:
+                # Ignore any other error (but count it, so it shows in the metrics)
+                failed += 1
+                metrics.incr(f"search.errors.{type(e).__name__}")
+        return items, failed
+
+    def _take(self, run, tweet_id, tweet):
+        # a new tweet of the page: write it now (PipelinedSearchScraper hands it to a worker)
+        run.write(tweet_id, tweet)
+
+    def _flush(self):
+        # wait until every taken tweet is written (nothing to wait for here, see PipelinedSearchScraper)
+        pass
+
+    def search_hashtag(self, hashtag: str, limit: int | None = None, batch: bool = True, sink=None,
+                       since: date | None = None, until: date | None = None, index=None,
+                       max_id: int | None = None, stop=None):
+        # If a sink is given (see CSVHandler.open_stream), every new tweet goes straight
+        # to the sink and is not kept in memory, so the returned list stays empty.
+        # since/until (optional) limit the search to a date window.
+        # With a TweetIndex, we stop when we reach tweets scraped in an earlier run
+        # (and only then, or at the end of the timeline, the index saves its new mark).
+        # max_id (optional) starts at this tweet ID and older (to go on after a RateLimited).
+        # Raises RateLimited (with the tweets so far) when X shows a rate-limit or login page.
+        # stop (optional threading.Event): another thread ends the search at the next scroll.
         # Open the live search page for the given hashtag
-        self.driver.get(LIVE_URL.format(tag=hashtag.lstrip("#")))
-        time.sleep(3)  # wait a little for the page to load
+        body = self._open_search(hashtag, since, until, max_id)
 
-        seen_ids = set()   # to remember tweets we already saw
-        out = []           # list of all tweet data
-        body = self.driver.find_element(By.TAG_NAME, "body")
+        # what is written so far (the sink knows the IDs of a resumed run)
+        run = SearchRun(sink, index)
 
         stagnant_scrolls = 0  # how many times we scrolled without new tweets
+        scrolls = 0           # scrolls since the page was (re)loaded
 
         # while loop to keep scrolling and searching for new tweets
-        while True:
-            # Find all tweet cards on the page
-            cards = self.driver.find_elements(By.XPATH, '//article[@data-testid="tweet"]')
-            new_found = 0
+        while stop is None or not stop.is_set():
+            new_found = duplicates = 0
+            reached_old = False  # found a tweet from an earlier run (index)
+            extract_start = time.perf_counter()
+            items, failed = self._page_items(batch)
 
-            for c in cards:
-                try:
-                    d = self._tweet_to_dict(c)  # turn tweet into dictionary
-                    if d["tweet_id"] in seen_ids:
-                        continue  # skip if already seen
-                    seen_ids.add(d["tweet_id"])
-                    out.append(d)
-                    new_found += 1
-
-                    # If we hit the limit, stop and return what we have
-                    if limit and len(out) >= limit:
-                        return out
-                except StaleElementReferenceException:
-                    # Tweet disappeared (page updated), skip it
+            for tweet_id, tweet in items:
+                if tweet_id in run.seen_ids or tweet_id in run.pending:
+                    duplicates += 1
+                    continue  # skip if already seen (safety net, marked cards are skipped before)
+                if index is not None and index.is_old(tweet_id):
+                    reached_old = True  # older tweets are below this one, already scraped
                     continue
-                except Exception:
-                    # Ignore any other error
+                if limit and run.found + len(run.pending) >= limit:
+                    # enough on the way: wait for them, a tweet that failed is not counted
+                    self._flush()
+                    if run.found >= limit:
+                        break
+                try:
+                    self._take(run, tweet_id, tweet)
+                except Exception as e:
+                    # Ignore a tweet that can not be written (but count it, so it shows in the metrics)
+                    failed += 1
+                    metrics.incr(f"search.errors.{type(e).__name__}")
                     continue
+                new_found += 1
 
-            # Scroll down the page
-            body.send_keys(Keys.END)
-            time.sleep(1.5)
+            # with a limit in sight, wait for the tweets on the way: a failed one is not counted
+            if limit and run.found + len(run.pending) >= limit:
+                self._flush()
+            self._record_scroll(extract_start, len(items), new_found, duplicates, failed)
+
+            # If we hit the limit, stop and return what we have
+            if limit and run.found >= limit:
+                return run.out
+
+            # Everything below is from an earlier run, nothing more to scrape
+            if reached_old:
+                self._flush()
+                index.finish()  # complete down to the old mark: save the new one
+                return run.out
+
+            # Scroll down the page, and wait until new tweets are loaded (or timeout)
+            self._scroll(body, stagnant_scrolls)
+            scrolls += 1
 
             if new_found == 0:
                 stagnant_scrolls += 1  # No new tweets found
             else:
                 stagnant_scrolls = 0   # Reset if new tweets were found
+            self._check_blocked(stagnant_scrolls, run.out, run.oldest_id)
 
-            # If no limit, stop when no new tweets after several scrolls
-            if not limit and stagnant_scrolls >= 4:
-                return out
+            # Stop when no new tweets after several scrolls: the end of the timeline
+            # (also with a limit, a timeline can have fewer tweets than the limit)
+            if stagnant_scrolls >= 4:
+                if index is not None:
+                    self._flush()
+                    index.finish()  # end of the timeline, nothing was skipped
+                return run.out
+
+            # Long run: a fresh page when the old one got too big (memory stays flat)
+            # (the stagnant count goes on, so an empty page after a reload still ends the run)
+            if run.oldest_id is not None and self._needs_recycle(scrolls):
+                try:
+                    body = self._recycle(hashtag, since, until, run.oldest_id)
+                except RateLimited as e:
+                    e.partial, e.oldest_id = run.out, run.oldest_id
+                    raise
+                scrolls = 0
+        return run.out  # stopped by another thread (stop)
@@ -0,0 +1,249 @@
+# session_pool.py
+"""Several logged-in accounts (one cookie file each) that share the scraping work.
+
+Every session has a token bucket (requests per minute, with a small burst):
+SearchScraper waits for a token before every page load and scroll, so one
+account never goes over its own rate. When X still shows a rate-limit page the
+session cools down (longer after every new rate limit in a row) and its work
+goes on in another session. A login wall (cookies expired) takes the session
+out for good; a Chrome that does not start only rests the session for a while.
+
+    pool = SessionPool(["acc1.json", "acc2.json", "acc3.json"], per_minute=40)
+    with pool:
+        SessionScheduler(pool).scrape("genai", limit=5000, sink=sink)
+"""
+import queue, threading, time
+from browser import make_driver
+from cookies_loader import CookiesLoader
+from metrics import metrics
+from search_scraper import SearchScraper
+from sharded_scraper import ShardedScraper, WindowSink
+from utils import RateLimited
+
+
+class TokenBucket:
+    """`rate` tokens per second on average, at most `burst` saved up."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def delay(self, now=None):
+        # seconds until one token is free (0 when there is one now)
+        self._refill(time.monotonic() if now is None else now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def empty(self):
+        # after a rate limit: start again from zero, no burst
+        self.tokens = 0.0
+        self.stamp = time.monotonic()
+
+
+class Session:
+    """One account: its cookie file, its browser, its request budget and its health."""
+
+    def __init__(self, name, cookies_path, rate, burst):
+        self.name = name
+        self.cookies_path = cookies_path
+        self.bucket = TokenBucket(rate, burst)
+        self.driver = None
+        self.busy = False
+        self.dead = False           # logged out, not used again
+        self.strikes = 0            # rate limits in a row
+        self.cooldown_until = 0.0   # time.monotonic() when it can work again
+        self.requests = 0
+        self.rate_limits = 0
+
+    def wait(self):
+        # called by SearchScraper before every page load and scroll (throttle)
+        pause = self.bucket.delay()
+        while pause > 0:
+            metrics.add_time("sessions.throttle_wait", pause)
+            time.sleep(pause)
+            pause = self.bucket.delay()
+        self.bucket.take()
+        self.requests += 1
+
+
+class SessionPool:
+    """Sessions that take turns: acquire() gives the free session that can work first.
+
+    `cookies_paths` has one cookie file per account (None = no cookies, for a local
+    stand-in server). After a rate limit a session waits `cooldown` seconds, doubled
+    for every rate limit in a row, at most `max_cooldown`.
+    """
+
+    def __init__(self, cookies_paths, per_minute=30, burst=5, cooldown=60, max_cooldown=900,
+                 headless=True, lean=True):
+        self.sessions = [Session(str(p or f"session{i}"), p, per_minute / 60, burst)
+                         for i, p in enumerate(cookies_paths)]
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.headless = headless
+        self.lean = lean
+        self._cond = threading.Condition()
+
+    def _start(self, s):
+        # Chrome starts the first time a session is used
+        driver = make_driver(self.headless, lean=self.lean)
+        try:
+            if s.cookies_path:
+                CookiesLoader.load_cookies(driver, s.cookies_path)
+        except Exception:
+            driver.quit()
+            raise
+        s.driver = driver
+
+    def acquire(self):
+        # the free session with the shortest cooldown; waits while they all cool down or work
+        with self._cond:
+            while True:
+                if all(s.dead for s in self.sessions):
+                    raise RuntimeError("All sessions are logged out (login wall), refresh the cookie files")
+                now = time.monotonic()
+                free = [s for s in self.sessions if not s.busy and not s.dead]
+                if not free:
+                    self._cond.wait()
+                    continue
+                s = min(free, key=lambda x: (x.cooldown_until, x.bucket.delay(now)))
+                if s.cooldown_until <= now:
+                    s.busy = True
+                    break
+                self._cond.wait(s.cooldown_until - now)
+        if s.driver is None:
+            try:
+                self._start(s)
+            except Exception as e:
+                print(f"[WARN] Session {s.name} could not start:", e)
+                # often a passing problem (Chrome busy, slow disk): rest it, the work goes to another session
+                self.release(s, blocked="start_failed")
+                raise
+        return s
+
+    def release(self, s, blocked=None, broken=False):
+        # blocked: "rate_limit" (cool down), "start_failed" (rest `cooldown` seconds)
+        # or "login_wall" (out for good); broken: restart Chrome
+        driver = None
+        with self._cond:
+            s.busy = False
+            if blocked == "login_wall":
+                s.dead = True
+                metrics.incr("sessions.login_walls")
+                print(f"[WARN] Session {s.name} is logged out, not used again")
+            elif blocked == "rate_limit":
+                s.strikes += 1
+                s.rate_limits += 1
+                pause = min(self.max_cooldown, self.cooldown * 2 ** (s.strikes - 1))
+                s.cooldown_until = time.monotonic() + pause
+                s.bucket.empty()
+                metrics.incr("sessions.rate_limits")
+                print(f"[WARN] Session {s.name} rate limited, cooling down {pause:g}s")
+            elif blocked == "start_failed":
+                s.cooldown_until = time.monotonic() + self.cooldown
+                metrics.incr("sessions.start_failures")
+            else:
+                s.strikes = 0
+            if s.dead or broken:
+                driver, s.driver = s.driver, None
+            self._cond.notify_all()
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def stats(self):
+        now = time.monotonic()
+        return [{"session": s.name, "requests": s.requests, "rate_limits": s.rate_limits,
+                 "dead": s.dead, "cooldown_left": round(max(0.0, s.cooldown_until - now), 1)}
+                for s in self.sessions]
+
+    def close(self):
+        with self._cond:
+            drivers = [s.driver for s in self.sessions if s.driver is not None]
+            for s in self.sessions:
+                s.driver = None
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionScheduler(ShardedScraper):
+    """ShardedScraper on a SessionPool: each date window goes to the session that can work first.
+
+    A window stopped by a rate limit goes back to the queue from its oldest tweet
+    (max_id), so another session goes on with it while this one cools down, at most
+    `rate_limit_retries` times. A window that fails (or finds no session that starts)
+    is tried again `retries` times. Windows that could not be finished are in `missed`
+    after scrape().
+    """
+
+    def __init__(self, pool, base_url="https://x.com", retries=2, rate_limit_retries=5):
+        super().__init__(len(pool.sessions), pool.headless, None, pool.lean, retries)
+        self.pool = pool
+        self.base_url = base_url
+        self.rate_limit_retries = rate_limit_retries
+
+    def _worker(self, hashtag, windows, results, limit):
+        try:
+            while not self._stop.is_set():
+                try:
+                    since, until, *rest = windows.get_nowait()
+                except queue.Empty:
+                    return
+                # tries: failed attempts, limits: rate limits so far
+                max_id, tries, limits = rest or (None, 0, 0)
+                try:
+                    s = self.pool.acquire()
+                except Exception as e:
+                    # no session could start: another one (or this one after its rest) tries again
+                    if tries < self.retries:
+                        windows.put((since, until, max_id, tries + 1, limits))
+                    else:
+                        print(f"[WARN] Window {since} -> {until} not scraped:", e)
+                        self.missed.append((since, until))
+                    continue
+                blocked = broken = False
+                try:
+                    search = SearchScraper(s.driver, base_url=self.base_url, throttle=s)
+                    search.search_hashtag(hashtag, limit=self._budget(limit), since=since, until=until,
+                                          max_id=max_id, sink=WindowSink(results), stop=self._stop)
+                    results.put(("done", (since, until)))
+                except RateLimited as e:
+                    blocked = e.kind
+                    # (the rows before the rate limit are already streamed by the WindowSink)
+                    # go on from the oldest tweet we got, in the next free session
+                    if limits < self.rate_limit_retries:
+                        windows.put((since, until, e.oldest_id - 1 if e.oldest_id else max_id, tries, limits + 1))
+                    else:
+                        print(f"[WARN] Window {since} -> {until} rate limited {limits + 1} times, given up")
+                        self.missed.append((since, until))
+                except Exception as e:
+                    broken = True
+                    if tries < self.retries:
+                        windows.put((since, until, max_id, tries + 1, limits))
+                    else:
+                        print(f"[WARN] Window {since} -> {until} failed:", e)
+                        self.missed.append((since, until))
+                finally:
+                    self.pool.release(s, blocked, broken)
+        finally:
+            results.put(None)  # tells the main thread this worker is done
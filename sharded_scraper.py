@@ -0,0 +1,138 @@
+import queue, threading
+from datetime import date, timedelta
+from browser import make_driver
+from cookies_loader import CookiesLoader
+from search_scraper import SearchScraper, FIRST_DAY
+
+
+def split_windows(since: date, until: date, shards: int):
+    """Split the days [since, until) into at most `shards` (since, until) windows of about the same size."""
+    days = (until - since).days
+    shards = max(1, min(shards, days))
+    step, extra = divmod(days, shards)
+    windows, lo = [], since
+    for i in range(shards):
+        hi = lo + timedelta(days=step + (1 if i < extra else 0))
+        windows.append((lo, hi))
+        lo = hi
+    return windows
+
+
+class WindowSink:
+    """Sink of one window in a worker thread: every new row goes to the main thread at once.
+
+    So rows are written while the windows are scraped (not kept until a window ends),
+    and the main thread sees when the limit is reached.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.seen_ids = set()  # this window only, the main thread removes repeats of other windows
+
+    def write(self, row):
+        self.seen_ids.add(row["tweet_id"])
+        self.results.put(("row", row))
+
+
+class ShardedScraper:
+    """Scrape one hashtag with several browsers at the same time.
+
+    The date range is cut into since:/until: windows, and every worker (one Chrome
+    each, with its own cookies) takes the next window from a queue. Rows are streamed
+    to the calling thread, deduplicated by tweet_id and written to the sink right away.
+    Each window only scrapes what is still missing to the limit, and once the limit
+    is reached the workers stop (running windows stop at their next scroll).
+    A window that fails is tried again `retries` times; windows that could not be
+    scraped are in `missed` after scrape() (their tweets are not in the result).
+    """
+
+    def __init__(self, workers=4, headless=True, cookies_path="twitter_cookies.json", lean=True, retries=1):
+        self.workers = workers
+        self.headless = headless
+        self.lean = lean
+        self.cookies_path = cookies_path
+        self.retries = retries
+        self.missed = []                # (since, until) of the windows not scraped
+        self._stop = threading.Event()  # set when the limit is reached
+        self._found = 0                 # rows written so far (updated by the main thread)
+
+    def _budget(self, limit):
+        # what is still missing to the limit, for the next window (None = no limit)
+        return None if not limit else max(1, limit - self._found)
+
+    def _worker(self, hashtag, windows, results, limit):
+        driver = None
+        try:
+            driver = make_driver(self.headless, lean=self.lean)
+            CookiesLoader.load_cookies(driver, self.cookies_path)
+            search = SearchScraper(driver)
+            while not self._stop.is_set():
+                try:
+                    since, until, *rest = windows.get_nowait()
+                except queue.Empty:
+                    return
+                tries = rest[0] if rest else 0  # failed attempts so far
+                try:
+                    search.search_hashtag(hashtag, limit=self._budget(limit), since=since, until=until,
+                                          sink=WindowSink(results), stop=self._stop)
+                    results.put(("done", (since, until)))
+                except Exception as e:
+                    # the rows before the error are already streamed, a retry skips them (seen_ids)
+                    if tries < self.retries:
+                        windows.put((since, until, tries + 1))
+                    else:
+                        print(f"[WARN] Window {since} -> {until} failed:", e)
+                        self.missed.append((since, until))
+        except Exception as e:
+            print("[WARN] Worker stopped:", e)
+        finally:
+            if driver is not None:
+                driver.quit()
+            results.put(None)  # tells the main thread this worker is done
+
+    def scrape(self, hashtag: str, since: date | None = None, until: date | None = None,
+               limit: int | None = None, sink=None, shards: int | None = None):
+        since = since or FIRST_DAY
+        until = until or date.today() + timedelta(days=1)
+        self._stop.clear()
+        self._found = 0
+        self.missed = []
+
+        # More windows than workers, so a fast worker can take more of them (busy days are slower)
+        windows = queue.Queue()
+        for w in split_windows(since, until, shards or self.workers * 4):
+            windows.put(w)
+
+        results = queue.Queue()
+        threads = [
+            threading.Thread(target=self._worker, args=(hashtag, windows, results, limit), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+
+        # merge the rows of all windows while they come, without duplicates
+        seen_ids = sink.seen_ids if sink is not None else set()
+        out, done, running = [], 0, len(threads)
+        while running:
+            item = results.get()
+            if item is None:
+                running -= 1
+                continue
+            kind, d = item
+            if kind == "done":
+                done += 1
+                continue
+            if d["tweet_id"] in seen_ids or self._stop.is_set():
+                continue
+            seen_ids.add(d["tweet_id"])
+            if sink is not None:
+                sink.write(d)
+            else:
+                out.append(d)
+            self._found += 1
+            if limit and self._found >= limit:
+                self._stop.set()  # enough tweets: no new windows, running ones stop soon
+        if not done:
+            raise RuntimeError(f"No date window of #{hashtag.lstrip('#')} could be scraped")
+        return out
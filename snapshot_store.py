@@ -0,0 +1,50 @@
+import gzip, hashlib, json, os, threading, time
+
+
+class SnapshotStore:
+    """Raw pages saved on disk, so they can be parsed again later without the browser.
+
+    Every snapshot is gzip-compressed and saved under its own SHA-256 hash
+    (objects/ab/abcdef....gz), so the same content is only stored once.
+    manifest.jsonl has one line per snapshot: hash, kind, url and time.
+    Kinds: "search" (HTML of tweet cards), "profile" (profile page HTML), "api" (X API JSON).
+    """
+
+    def __init__(self, root="snapshots"):
+        self.root = root
+        self.manifest = os.path.join(root, "manifest.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest + ".gz")
+
+    def put(self, kind, content, url=None, **meta):
+        # save one snapshot, gives back its hash (nothing new is written for a known content)
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        with self._lock:
+            if os.path.exists(path):
+                return digest
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with gzip.open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # a crash never leaves a half-written object
+            entry = {"hash": digest, "kind": kind, "url": url, "time": time.time(), **meta}
+            with open(self.manifest, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def get(self, digest):
+        with gzip.open(self.path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def entries(self):
+        if not os.path.exists(self.manifest):
+            return
+        with open(self.manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
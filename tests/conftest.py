@@ -0,0 +1,122 @@
+# conftest.py
+"""Shared test helpers: the benchmark stand-in server, and drivers without a browser.
+
+StaticDriver fetches pages with urllib and answers find_elements with lxml XPath,
+so the scrapers' page checks run offline without Chrome. It runs no JavaScript
+(execute_script gives None), which is enough for checks that only look at the HTML.
+FeedDriver answers the scroll loop's own scripts, so SearchScraper runs on it unchanged
+(QuickSearch: with short scroll waits, WindowFeed: a few tweets in every date window).
+"""
+import os, re, sys
+import urllib.error, urllib.request
+import pytest
+from lxml import html as lxml_html
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_scraper import SearchScraper, CARDS_JS, UNREAD_JS
+
+
+class StaticDriver:
+    def __init__(self):
+        self.tree = None
+        self.current_url = None
+        self.urls = []  # every page opened, in order
+
+    def get(self, url):
+        self.current_url = url
+        self.urls.append(url)
+        try:
+            with urllib.request.urlopen(url, timeout=10) as r:
+                body = r.read()
+        except urllib.error.HTTPError as e:
+            body = e.read()  # rate-limit pages still have a body to look at
+        self.tree = lxml_html.fromstring(body)
+
+    def find_elements(self, by, value):
+        return self.tree.xpath(value) if self.tree is not None else []
+
+    def execute_script(self, script, *args):
+        return None
+
+    def quit(self):
+        pass
+
+
+class FeedDriver:
+    """A timeline without a browser: every scroll shows the next 3 cards (ids first, first - 1, ...).
+
+    Every get() opens the timeline again from its top."""
+
+    def __init__(self, total=30, per_scroll=3, first=100):
+        self.total, self.per_scroll, self.first = total, per_scroll, first
+        self.shown, self.read = min(total, per_scroll), 0
+        self.current_url = "feed"
+        self.urls = []  # every page opened, in order
+
+    def get(self, url):
+        self.current_url = url
+        self.urls.append(url)
+        self.shown, self.read = min(self.total, self.per_scroll), 0
+
+    def find_elements(self, by, value):
+        return [object()]  # tweets are on the page
+
+    def find_element(self, by, value):
+        driver = self
+
+        class Body:
+            def send_keys(self, key):
+                driver.shown = min(driver.total, driver.shown + driver.per_scroll)
+        return Body()
+
+    def execute_script(self, script, *args):
+        if script == CARDS_JS:
+            raws = [{"tweet_url": f"https://x.com/u/status/{self.first - i}", "post_time": "2024-01-01T00:00:00.000Z",
+                     "profile_url": "https://x.com/u", "content": f"tweet {i} #bench",
+                     "reply": "1", "retweet": "2", "like": "3"} for i in range(self.read, self.shown)]
+            self.read = self.shown
+            return raws
+        if "scrollHeight" in script:
+            return self.shown * 100
+        if script == UNREAD_JS:
+            return 0
+        return None  # no rate-limit page
+
+    def quit(self):
+        pass
+
+
+class WindowFeed(FeedDriver):
+    """Two tweets in every date window, with IDs from the window's day (2024-01-03 -> 202401030, ...)."""
+
+    def __init__(self):
+        super().__init__(total=2)
+
+    def get(self, url):
+        super().get(url)
+        self.first = int(re.search(r"since%3A(\d{4})-(\d\d)-(\d\d)", url).expand(r"\1\2\3")) * 10
+
+
+class QuickSearch(SearchScraper):
+    """The real SearchScraper, with short scroll waits."""
+
+    def __init__(self, driver, **kwargs):
+        super().__init__(driver, **kwargs)
+        self.scroll_waiter.min_timeout = self.scroll_waiter.max_timeout = 0.05
+
+
+@pytest.fixture
+def standin():
+    """Start the benchmark stand-in server; gives a function (cards, spacing) -> base URL."""
+    from benchmark import start_server
+    servers = []
+
+    def start(cards=50, spacing=60, throttle=None):
+        server, url = start_server(cards, throttle, spacing)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,22 @@
+import csv, threading
+import browser
+import batch_runner
+from batch_runner import run_batch
+from conftest import FeedDriver, QuickSearch
+
+
+def test_limit_larger_than_the_timeline(tmp_path, monkeypatch):
+    # the real scroll loop on timelines of 3 tweets, with a limit of 10 per hashtag
+    monkeypatch.setattr(browser, "make_driver", lambda *a, **k: FeedDriver(total=3))
+    monkeypatch.setattr(browser.CookiesLoader, "load_cookies", staticmethod(lambda d, p: None))
+    monkeypatch.setattr(batch_runner, "SearchScraper", QuickSearch)
+    result = []
+    t = threading.Thread(target=lambda: result.append(
+        run_batch(["genai", "ml"], workers=2, limit=10, out_dir=str(tmp_path), retries=0)), daemon=True)
+    t.start()
+    t.join(20)
+    assert not t.is_alive(), "the batch did not end"
+    assert result == [[]]  # no failed hashtag
+    for tag in ("genai", "ml"):
+        with open(tmp_path / f"{tag}.csv", newline="", encoding="utf-8") as f:
+            assert [row["tweet_id"] for row in csv.DictReader(f)] == ["100", "99", "98"]
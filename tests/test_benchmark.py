@@ -0,0 +1,13 @@
+import json, os
+from benchmark import BASELINE, missing_in_baseline
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_metrics_without_a_baseline_number_are_reported():
+    with open(os.path.join(HERE, BASELINE), encoding="utf-8") as f:
+        baseline = json.load(f)
+    results = {"parse_counts.10000.seconds": 0.001, "search.cards_per_sec": 900.0, "search.cards": 500,
+               "peak_rss_tree_mb": 410.0, "startup.selenium_imported": 0}
+    # the committed baseline has no browser numbers: those must not pass unchecked
+    assert missing_in_baseline(results, baseline) == ["search.cards_per_sec", "peak_rss_tree_mb"]
@@ -0,0 +1,54 @@
+import csv, os
+from csv_handler import CSVHandler
+
+
+def rows_of(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_resume_appends_without_a_second_header(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    with CSVHandler.open_stream(path) as sink:
+        sink.write({"tweet_id": "20"})
+    with CSVHandler.open_stream(path, resume=True) as sink:
+        assert sink.seen_ids == {"20"}
+        sink.write({"tweet_id": "10"})
+    assert [r["tweet_id"] for r in rows_of(path)] == ["20", "10"]
+    with open(path + ".seen", encoding="utf-8") as f:
+        assert f.read().split() == ["20", "10"]
+
+
+def test_missing_checkpoint_is_rebuilt_from_the_csv(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    with CSVHandler.open_stream(path) as sink:
+        for tid in ("30", "20"):
+            sink.write({"tweet_id": tid})
+    os.remove(path + ".seen")
+    with CSVHandler.open_stream(path, resume=True) as sink:
+        assert sink.seen_ids == {"30", "20"}
+    with open(path + ".seen", encoding="utf-8") as f:
+        assert set(f.read().split()) == {"30", "20"}
+
+
+def test_resume_max_id_is_below_the_oldest_numeric_id(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    with CSVHandler.open_stream(path) as sink:
+        for tid in ("1745000000000000300", "1745000000000000100", "0b7c6a2e-fake-uuid", "1745000000000000200"):
+            sink.write({"tweet_id": tid})
+    with CSVHandler.open_stream(path, resume=True) as sink:
+        assert sink.resume_max_id == 1745000000000000099
+    # a fresh (not resumed) stream has nothing to go on from
+    with CSVHandler.open_stream(str(tmp_path / "new.csv")) as sink:
+        assert sink.resume_max_id is None
+
+
+def test_parquet_keeps_the_count_types(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    CSVHandler.save_to_csv([{"tweet_id": "1", "likes": "1.2K", "views": "5", "post_time": "2024-01-10T08:15:00.000Z"},
+                            {"tweet_id": "2"}], path)
+    df = CSVHandler.load_from_parquet(CSVHandler.csv_to_parquet(path))
+    assert {col: str(df[col].dtype) for col in ("likes", "comments", "reposts", "views")} == {
+        "likes": "UInt32", "comments": "UInt32", "reposts": "UInt32", "views": "UInt64"}
+    assert df["likes"][0] == 1200 and df["likes"].isna().tolist() == [False, True]
+    assert str(df["post_time"].dtype).startswith("datetime64") and str(df["user_handle"].dtype) == "category"
@@ -0,0 +1,43 @@
+import threading
+import pytest
+import browser
+from browser import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+def test_close_while_chrome_starts_quits_the_new_driver(monkeypatch):
+    starting, go_on, made = threading.Event(), threading.Event(), []
+
+    def slow_driver(*args, **kwargs):
+        starting.set()
+        go_on.wait(5)
+        made.append(FakeDriver())
+        return made[-1]
+
+    monkeypatch.setattr(browser, "make_driver", slow_driver)
+    monkeypatch.setattr(browser.CookiesLoader, "load_cookies", staticmethod(lambda d, p: None))
+    pool = DriverPool(size=1)
+    errors = []
+
+    def job():
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=job)
+    t.start()
+    starting.wait(5)
+    pool.close()
+    go_on.set()
+    t.join(5)
+    assert made[0].closed and errors
+    with pytest.raises(RuntimeError):
+        pool.acquire()
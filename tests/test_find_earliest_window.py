@@ -0,0 +1,41 @@
+from datetime import date
+import pytest
+from search_scraper import SearchScraper
+from conftest import StaticDriver
+
+DAY = 24 * 3600
+
+
+def test_bisection_finds_earliest_day(standin):
+    # 50 cards, one every 3 days: the oldest is posted on 2024-01-04
+    base = standin(cards=50, spacing=3 * DAY)
+    search = SearchScraper(StaticDriver(), base_url=base)
+    assert search.find_earliest_window("bench") == (date(2024, 1, 4), date(2024, 1, 5))
+
+
+def test_no_tweets_at_all(standin):
+    base = standin(cards=50, spacing=3 * DAY)
+    search = SearchScraper(StaticDriver(), base_url=base)
+    assert search.find_earliest_window("bench", date(2020, 1, 1), date(2023, 1, 1)) is None
+
+
+class BlankWindowDriver(StaticDriver):
+    """A page that never loads (neither tweets nor "no results") for windows ending on `until`."""
+
+    def __init__(self, until):
+        super().__init__()
+        self.until = until
+
+    def find_elements(self, by, value):
+        if f"until%3A{self.until}" in self.current_url:
+            return []
+        return super().find_elements(by, value)
+
+
+def test_unknown_window_raises_instead_of_empty(standin):
+    base = standin(cards=50, spacing=3 * DAY)
+    search = SearchScraper(BlankWindowDriver("2024-01-05"), base_url=base)
+    # the blank page only times out, no need to wait long
+    search.page_waiter.min_timeout = search.page_waiter.max_timeout = 0.2
+    with pytest.raises(RuntimeError):
+        search.find_earliest_window("bench", date(2024, 1, 1), date(2024, 1, 9))
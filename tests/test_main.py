@@ -0,0 +1,86 @@
+import inspect, json, os, subprocess, sys
+import pytest
+import main
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# what the offline commands must never load (they import what they need when they run)
+HEAVY = ["selenium", "pandas", "numpy", "pyarrow", "lxml"]
+# the real run() (the `calls` fixture replaces it)
+RUN_PARAMETERS = inspect.signature(main.run).parameters
+
+STARTUP_CODE = """
+import contextlib, io, json, sys
+import main
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        main.main(sys.argv[2:])
+    except SystemExit:
+        pass
+print(json.dumps([m for m in json.loads(sys.argv[1]) if m in sys.modules]))
+"""
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "run", lambda *args, **kwargs: calls.append(("scrape",) + args + (kwargs,)))
+    monkeypatch.setattr(main, "stats", lambda *args: calls.append(("stats",) + args))
+    return calls
+
+
+@pytest.mark.parametrize("argv, hashtag", [
+    (["genai"], "genai"),
+    (["--headless", "genai"], "genai"),
+    (["-l", "50", "genai", "-o", "out.csv"], "genai"),
+    (["--limit=50", "genai"], "genai"),
+    (["scrape", "stats"], "stats"),
+])
+def test_scrape_command(calls, argv, hashtag):
+    main.main(argv)
+    assert calls[0][:2] == ("scrape", hashtag)
+
+
+def test_scrape_flags_reach_their_parameters(calls):
+    main.main(["genai", "--keep-media", "-w", "3", "--metrics", "m.json", "-o", "out.csv"])
+    kwargs = calls[0][-1]
+    assert (kwargs["lean"], kwargs["workers"], kwargs["metrics_path"], kwargs["out_csv"]) == (False, 3, "m.json", "out.csv")
+    # every flag is passed by the name of its run() parameter
+    assert set(kwargs) == set(RUN_PARAMETERS) - {"hashtag"}
+
+
+def test_command_is_not_a_hashtag(calls):
+    main.main(["stats", "tweets.csv"])
+    assert calls == [("stats", "tweets.csv", 10)]
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["stats", "{csv}"]])
+def test_startup_imports_no_heavy_module(tmp_path, argv):
+    path = tmp_path / "tweets.csv"
+    path.write_text("tweet_id,user_handle,hashtags,post_time,likes\n1,a,#genai,2024-01-01T00:00:00+0000,3\n",
+                    encoding="utf-8")
+    argv = [a.format(csv=path) for a in argv]
+    done = subprocess.run([sys.executable, "-c", STARTUP_CODE, json.dumps(HEAVY)] + argv, cwd=HERE,
+                          capture_output=True, text=True, check=True)
+    assert json.loads(done.stdout.strip().splitlines()[-1]) == []
+
+
+def test_sessions_do_not_need_the_default_cookies(tmp_path, monkeypatch):
+    import browser, cookies_loader, session_pool
+    opened = []
+    monkeypatch.setattr(browser, "make_driver", lambda *a, **k: opened.append("driver"))
+    monkeypatch.setattr(cookies_loader.CookiesLoader, "load_cookies", staticmethod(lambda d, p: opened.append(p)))
+    monkeypatch.setattr(session_pool.SessionScheduler, "scrape", lambda self, *a, **k: [])
+    main.run("bench", out_csv=str(tmp_path / "tweets.csv"), sessions=["acc1.json"])
+    assert opened == []  # no tweets, no originator: no browser besides the sessions' own
+
+
+@pytest.mark.parametrize("argv", [
+    ["genai", "-w", "3", "--snapshots", "snaps"],
+    ["genai", "--sessions", "a.json", "b.json", "--network"],
+    ["genai", "-w", "2", "--pipeline", "2"],
+    ["genai", "-w", "2", "--recycle-mb", "512"],
+])
+def test_worker_modes_reject_options_they_do_not_use(calls, argv):
+    with pytest.raises(SystemExit):
+        main.main(argv)
+    assert calls == []
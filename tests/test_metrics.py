@@ -0,0 +1,16 @@
+from metrics import Metrics
+
+
+def test_prometheus_driver_calls_are_one_labeled_metric(tmp_path):
+    m = Metrics()
+    for name in ["driver.calls", "driver.calls.findElement", "driver.calls", "driver.calls.executeScript",
+                 "search.cards.seen"]:
+        m.incr(name)
+    path = tmp_path / "run.prom"
+    m.to_prometheus(str(path))
+    lines = path.read_text().splitlines()
+    assert 'scraper_driver_calls_total{command="findElement"} 1' in lines
+    assert 'scraper_driver_calls_total{command="executeScript"} 1' in lines
+    assert lines.count("# TYPE scraper_driver_calls_total counter") == 1
+    assert not any(l.startswith("scraper_driver_calls_findElement") for l in lines)
+    assert "scraper_search_cards_seen_total 1" in lines
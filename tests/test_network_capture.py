@@ -0,0 +1,127 @@
+import json, re, threading, urllib.request
+from http.server import ThreadingHTTPServer
+import pytest
+from network_capture import NetworkCapture
+from replay_server import make_handler
+from profile_scraper import ProfileScraper
+from search_scraper import SearchScraper
+
+
+def user(handle, rest_id):
+    return {"data": {"user": {"result": {
+        "rest_id": rest_id, "core": {"screen_name": handle, "name": handle.title()},
+        "legacy": {"description": f"mail {handle}@example.com", "followers_count": 10, "friends_count": 2},
+    }}}}
+
+
+def timeline(*ids):
+    return {"data": {"entries": [{"tweet_results": {"result": {
+        "rest_id": str(i), "legacy": {"full_text": f"tweet {i} #bench", "favorite_count": i,
+                                      "entities": {"hashtags": [{"text": "bench"}]}},
+        "core": {"user_results": {"result": {"core": {"screen_name": "alice"}}}},
+    }}} for i in ids]}}
+
+
+class LogDriver:
+    """Plays Chrome for NetworkCapture: loads the replay page, fetches its API calls and
+    writes the CDP events to the performance log. A body can only be read after its
+    loadingFinished event, like in Chrome, and that event comes one get_log() later."""
+
+    def __init__(self):
+        self.log, self.late, self.bodies, self.next_id = [], [], {}, 0
+
+    def _event(self, method, **params):
+        return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as r:
+            page = r.read().decode("utf-8")
+        base = url.split("/", 3)[:3]
+        for name in json.loads(re.search(r"of (\[.*?\])\) fetch", page).group(1)):
+            api = "/".join(base) + f"/i/api/graphql/replay/{name.split('-')[0]}?file={name}"
+            with urllib.request.urlopen(api) as r:
+                body = r.read().decode("utf-8")
+            self.next_id += 1
+            rid = str(self.next_id)
+            self.log.append(self._event("Network.responseReceived", requestId=rid, response={"url": api}))
+            self.late.append((rid, body))
+
+    def get_log(self, kind):
+        out, self.log = self.log, []
+        for rid, body in self.late:
+            self.bodies[rid] = body
+            self.log.append(self._event("Network.loadingFinished", requestId=rid))
+        self.late = []
+        return out
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {"body": self.bodies[params["requestId"]]}  # KeyError before loadingFinished
+
+
+class ReplayDriver(LogDriver):
+    """LogDriver with a page to scroll: the replay page has no tweet cards, only its API calls."""
+
+    current_url = None
+
+    def get(self, url):
+        self.current_url = url
+        super().get(url)
+
+    def find_elements(self, by, value):
+        return []
+
+    def find_element(self, by, value):
+        return type("Body", (), {"send_keys": lambda self, key: None})()
+
+    def execute_script(self, script, *args):
+        return 0 if "scrollHeight" in script else None
+
+
+@pytest.fixture
+def replay(tmp_path):
+    for name, payload in {"UserByScreenName-bob.json": user("bob", "2"),
+                          "UserByScreenName-alice.json": user("alice", "1"),
+                          "SearchTimeline-a.json": timeline(11, 12)}.items():
+        (tmp_path / name).write_text(json.dumps(payload), encoding="utf-8")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(str(tmp_path)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_bodies_are_read_after_loading_finished(replay):
+    driver = LogDriver()
+    capture = NetworkCapture(driver)
+    driver.get(f"{replay}/search?q=%23bench")
+    assert capture.tweets() == []  # only responseReceived so far, the bodies are not loaded
+    tweets = capture.tweets()
+    assert [t["tweet_id"] for t in tweets] == ["11", "12"]
+    assert tweets[0]["hashtags"] == "#bench"
+
+
+def test_other_profiles_stay_queued(replay):
+    driver = LogDriver()
+    capture = NetworkCapture(driver)
+    driver.get(f"{replay}/alice")
+    capture.drain()  # the responses arrive, their bodies load one poll later
+    assert capture.profile("alice")["user_id"] == "1"
+    # bob's response came with alice's page: it waits in the queue for its own call
+    assert capture.profile("bob")["user_id"] == "2"
+    assert capture.profile("bob") is None
+
+
+def test_search_on_the_replay_server(replay):
+    # the page is ready when its SearchTimeline response is captured (there are no cards to wait for)
+    driver = ReplayDriver()
+    search = SearchScraper(driver, base_url=replay, capture=NetworkCapture(driver))
+    search.scroll_waiter.min_timeout = search.scroll_waiter.max_timeout = 0.05
+    tweets = search.search_hashtag("bench")
+    assert sorted(t["tweet_id"] for t in tweets) == ["11", "12"]
+
+
+def test_profile_on_the_replay_server(replay):
+    driver = ReplayDriver()
+    scraper = ProfileScraper(driver, csv_file=None, capture=NetworkCapture(driver))
+    scraper.waiter.min_timeout = scraper.waiter.max_timeout = 5
+    prof = scraper.scrape_profile(f"{replay}/alice", save=False)
+    assert prof["user_id"] == "1"
@@ -0,0 +1,36 @@
+import csv
+import pytest
+from csv_handler import CSVHandler, COLUMNS
+from originator_finder import OriginatorFinder
+
+
+def test_csv_and_parquet_give_the_same_originator(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "tweets.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
+        w.writeheader()
+        for i, t in enumerate(["2024-01-11T21:40:00.000Z", "2024-01-10T08:15:00.250Z", "2024-01-12T00:00:00.000Z"]):
+            w.writerow({"tweet_id": str(100 + i), "user_handle": f"@u{i}", "profile_url": f"https://x.com/u{i}",
+                        "tweet_url": f"https://x.com/u{i}/status/{100 + i}", "post_time": t, "likes": "1"})
+    from_csv = OriginatorFinder.find_originator_in_csv(path)
+    from_parquet = OriginatorFinder.find_originator_in_parquet(CSVHandler.csv_to_parquet(path))
+    assert from_csv["post_time"] == "2024-01-10T08:15:00.250Z"
+    assert from_parquet == from_csv
+
+
+def test_no_valid_post_time_is_no_originator(tmp_path):
+    import pandas as pd
+    df = pd.DataFrame({"tweet_id": ["a", "b"], "post_time": [None, "not a time"]})
+    assert OriginatorFinder.find_originator(df) is None
+    path = str(tmp_path / "tweets.csv")
+    CSVHandler.save_to_csv([{"tweet_id": "a"}, {"tweet_id": "b", "post_time": "not a time"}], path)
+    assert OriginatorFinder.find_originator_in_csv(path) is None
+
+
+def test_empty_fields_of_the_originator_are_none(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    CSVHandler.save_to_csv([{"tweet_id": "7", "post_time": "2024-01-10T08:15:00.000Z"}], path)
+    origin = OriginatorFinder.find_originator_in_csv(path)
+    assert origin["tweet_id"] == "7" and origin["profile_url"] is None and origin["user_handle"] is None
+    assert OriginatorFinder.find_originator(CSVHandler.load_from_csv(path))["profile_url"] is None
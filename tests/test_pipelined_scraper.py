@@ -0,0 +1,98 @@
+import threading
+import pytest
+from pipelined_scraper import PipelinedSearchScraper
+from search_scraper import SearchScraper, NEW_CARDS_XPATH, UNREAD_JS
+from conftest import FeedDriver
+
+
+class Node:
+    """A card (or a part of it) for the Selenium fallback: only the status link and its time are there."""
+
+    def __init__(self, url=None, attrs=None):
+        self.url, self.attrs, self.text = url, attrs or {}, ""
+
+    def find_element(self, by, value):
+        if self.url and "/status/" in value:
+            return Node(attrs={"href": self.url})
+        if "href" in self.attrs and value == "time":
+            return Node(attrs={"datetime": "2024-01-01T00:00:00.000Z"})
+        raise LookupError(value)  # no such part
+
+    def get_attribute(self, name):
+        return self.attrs.get(name)
+
+
+class FallbackDriver:
+    """A page where CARDS_JS does not run: one tweet and one promoted card without a status link."""
+
+    def __init__(self):
+        self.cards, self.marked = [Node("https://x.com/u/status/100"), Node()], set()
+        self.current_url = "feed"
+
+    def get(self, url):
+        pass
+
+    def find_elements(self, by, value):
+        if value == NEW_CARDS_XPATH:
+            return [c for c in self.cards if id(c) not in self.marked]
+        return [object()]  # tweets are on the page
+
+    def find_element(self, by, value):
+        return type("Body", (), {"send_keys": lambda self, key: None})()
+
+    def execute_script(self, script, *args):
+        if "setAttribute" in script:
+            self.marked.add(id(args[0]))
+        if script == UNREAD_JS:
+            return 0
+        return 100 if "scrollHeight" in script else None  # None: no card values, no rate-limit page
+
+
+@pytest.fixture
+def broken_tweet(monkeypatch):
+    # cleaning tweet 99 fails in the worker
+    clean = SearchScraper._raw_to_dict
+
+    def raw_to_dict(raw, stats=True):
+        if raw["tweet_url"].endswith("/99"):
+            raise ValueError("bad card")
+        return clean(raw, stats)
+    monkeypatch.setattr(SearchScraper, "_raw_to_dict", staticmethod(raw_to_dict))
+
+
+@pytest.mark.parametrize("cls", [SearchScraper, PipelinedSearchScraper])
+def test_limit_counts_only_written_tweets(cls, broken_tweet):
+    search = cls(FeedDriver())
+    search.scroll_waiter.min_timeout = search.scroll_waiter.max_timeout = 0.05
+    tweets = search.search_hashtag("bench", limit=5)
+    ids = [t["tweet_id"] for t in tweets]
+    assert "99" not in ids
+    assert sorted(ids) == ["100", "95", "96", "97", "98"]
+
+
+@pytest.mark.parametrize("cls", [SearchScraper, PipelinedSearchScraper])
+def test_limit_larger_than_the_timeline_ends_at_its_end(cls):
+    search = cls(FeedDriver(total=3))
+    search.scroll_waiter.min_timeout = search.scroll_waiter.max_timeout = 0.05
+    tweets = search.search_hashtag("bench", limit=10)
+    assert sorted(t["tweet_id"] for t in tweets) == ["100", "98", "99"]
+
+
+def test_pipeline_scrapes_the_whole_timeline():
+    search = PipelinedSearchScraper(FeedDriver(total=30), workers=3)
+    search.scroll_waiter.min_timeout = search.scroll_waiter.max_timeout = 0.05
+    tweets = search.search_hashtag("bench")
+    assert sorted(int(t["tweet_id"]) for t in tweets) == list(range(71, 101))
+
+
+@pytest.mark.parametrize("cls", [SearchScraper, PipelinedSearchScraper])
+def test_fallback_skips_cards_without_a_status_link(cls):
+    # the promoted card has no tweet ID: it must not come back as a new fake tweet on every scroll
+    search = cls(FallbackDriver())
+    search.scroll_waiter.min_timeout = search.scroll_waiter.max_timeout = 0.05
+    result = []
+    t = threading.Thread(target=lambda: result.append(search.search_hashtag("bench")), daemon=True)
+    t.start()
+    t.join(10)
+    assert not t.is_alive(), "the search did not end"
+    assert [tw["tweet_id"] for tw in result[0]] == ["100"]
@@ -0,0 +1,34 @@
+from profile_cache import ProfileCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+PROFILE = {"username_handle": "Alice", "user_id": "987654321", "followers_count": 5600}
+
+
+def test_fresh_and_expired_profiles(tmp_path):
+    clock = Clock()
+    cache = ProfileCache(str(tmp_path / "cache.db"), ttl=3600, clock=clock)
+    cache.put(PROFILE)
+    clock.now += 3599
+    assert cache.get("ALICE")["followers_count"] == 5600
+    assert cache.get_by_user_id(987654321)["username_handle"] == "Alice"
+    clock.now += 2
+    assert cache.get_by_user_id("987654321") is None  # stale: removed
+    assert cache.get("alice") is None
+    assert cache.stats() == {"size": 0, "hits": 2, "misses": 2, "evictions": 1, "hit_rate": 0.5}
+    cache.close()
+
+
+def test_ttl_zero_never_hits(tmp_path):
+    cache = ProfileCache(str(tmp_path / "cache.db"), ttl=0, clock=Clock())
+    cache.put(PROFILE)
+    assert cache.get("alice") is None
+    assert cache.stats()["hits"] == 0
+    cache.close()
@@ -0,0 +1,94 @@
+import csv
+from contextlib import contextmanager
+import pytest
+from csv_handler import CSVHandler
+from originator_finder import OriginatorFinder
+from profile_cache import ProfileCache
+from profile_scraper import ProfileScraper
+from records import PROFILE_COLUMNS, ProfileRecord
+
+
+class BlankDriver:
+    """A profile page that never shows its header (deleted account, slow load)."""
+
+    current_url = None
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_elements(self, by, value):
+        return []
+
+
+def test_profile_that_does_not_load_is_not_saved(tmp_path):
+    path = str(tmp_path / "profiles.csv")
+    cache = ProfileCache(str(tmp_path / "cache.db"))
+    scraper = ProfileScraper(BlankDriver(), path, cache=cache)
+    scraper.waiter.min_timeout = scraper.waiter.max_timeout = 0.2
+    with pytest.raises(RuntimeError):
+        scraper.scrape_profile("https://x.com/alice")
+    assert cache.get("alice") is None
+    with open(path, newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 1  # only the header
+    cache.close()
+
+
+class FakePool:
+    """DriverPool without Chrome: counts the browsers taken."""
+
+    size = 2
+
+    def __init__(self):
+        self.taken = 0
+
+    @contextmanager
+    def driver(self):
+        self.taken += 1
+        yield object()
+
+
+@pytest.fixture
+def fake_profiles(monkeypatch):
+    # one page load per profile: the handle comes back as the record, "broken" fails
+    def scrape(self, url, save=True):
+        handle = url.rstrip("/").split("/")[-1]
+        if handle == "broken":
+            raise RuntimeError("Profile page did not load")
+        return ProfileRecord.from_dict({"username_handle": handle, "user_id": str(len(handle))})
+    monkeypatch.setattr(ProfileScraper, "_scrape_profile", scrape)
+    writes = []
+    save_rows = ProfileScraper.save_rows
+    monkeypatch.setattr(ProfileScraper, "save_rows", lambda self, rows: (writes.append(len(rows)), save_rows(self, rows)))
+    return writes
+
+
+def test_scrape_many(tmp_path, fake_profiles):
+    path = str(tmp_path / "profiles.csv")
+    cache = ProfileCache(str(tmp_path / "cache.db"))
+    cache.put({"username_handle": "carol", "user_id": "5"})
+    pool = FakePool()
+    urls = ["https://x.com/alice", "https://x.com/ALICE/", "https://x.com/broken", "https://x.com/carol",
+            None, "https://x.com/bob"]
+    profiles = ProfileScraper.scrape_many(urls, pool, csv_file=path, cache=cache)
+    # same handle in another case once, the failed one left out, the rest in the order given
+    assert [p["username_handle"] for p in profiles] == ["alice", "carol", "bob"]
+    assert pool.taken == 3  # alice, broken, bob: the fresh cached carol needs no browser
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == PROFILE_COLUMNS and sorted(r[0] for r in rows[1:]) == ["alice", "bob"]
+    assert fake_profiles == [2]  # the new profiles in one write
+    assert cache.get("bob")["user_id"] == "3"
+    cache.close()
+
+
+def test_top_authors_by_engagement(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    CSVHandler.save_to_csv([
+        {"tweet_id": "1", "profile_url": "https://x.com/a", "likes": "1.2K", "comments": "3", "reposts": ""},
+        {"tweet_id": "2", "profile_url": "https://x.com/b", "likes": "900", "comments": "1,000", "reposts": "5"},
+        {"tweet_id": "3", "profile_url": "https://x.com/c", "likes": "1", "comments": None, "reposts": "1"},
+        {"tweet_id": "4", "profile_url": "https://x.com/c", "likes": "2", "comments": "1", "reposts": "1"},
+        {"tweet_id": "5", "profile_url": "https://x.com/c", "likes": "3", "comments": "1", "reposts": "1"},
+    ], path)
+    assert OriginatorFinder.top_authors(path, 2, by="engagement") == ["https://x.com/b", "https://x.com/a"]
+    assert OriginatorFinder.top_authors(path, 1, by="volume") == ["https://x.com/c"]
@@ -0,0 +1,18 @@
+from records import parse_count, parse_counts
+
+
+def test_parse_count():
+    assert parse_count("3,400") == 3400
+    assert parse_count("1.2K") == 1200
+    assert parse_count("5.6K Followers") == 5600
+    assert parse_count("321 media") == 321
+    assert parse_count("12.9") == 13
+    assert parse_count("") is None and parse_count(None) is None
+
+
+def test_parse_counts_too_big_is_empty():
+    s = parse_counts(["1.2K", "4.3B", "", "1.2K"])
+    assert str(s.dtype) == "UInt32"
+    assert s.tolist()[0] == 1200 and s.tolist()[3] == 1200
+    assert s.isna().tolist() == [False, True, True, False]
+    assert parse_counts(["4.3B"], "UInt64").tolist() == [4_300_000_000]
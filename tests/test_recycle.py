@@ -0,0 +1,44 @@
+import re
+from search_scraper import SearchScraper
+from conftest import FeedDriver
+
+
+class MaxIdFeed(FeedDriver):
+    """One timeline of 30 tweets (ids 100 .. 71); a search with max_id:N starts at tweet N."""
+
+    def get(self, url):
+        super().get(url)
+        m = re.search(r"max_id%3A(\d+)", url)
+        self.first = min(100, int(m.group(1))) if m else 100
+        self.total = self.first - 70
+        self.shown = min(self.total, self.per_scroll)
+
+
+def test_recycled_page_goes_on_below_the_oldest_tweet():
+    driver = MaxIdFeed()
+    search = SearchScraper(driver, recycle_scrolls=3)
+    search.scroll_waiter.min_timeout = search.scroll_waiter.max_timeout = 0.05
+    ids = [int(t["tweet_id"]) for t in search.search_hashtag("bench")]
+    assert sorted(ids) == list(range(71, 101))  # nothing lost, nothing twice
+    reloads = [int(m) for m in re.findall(r"max_id%3A(\d+)", " ".join(driver.urls))]
+    # every 3 scrolls (9 tweets) the page is opened again just below the oldest tweet written
+    assert reloads[:3] == [91, 82, 73]
+
+
+class HeapFeed(FeedDriver):
+    def __init__(self, heap_mb):
+        super().__init__()
+        self.heap_mb, self.cdp = heap_mb, []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append(cmd)
+        return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap_mb * 2**20}, {"name": "Nodes", "value": 9000}]}
+
+
+def test_memory_is_read_from_devtools():
+    driver = HeapFeed(300)
+    search = SearchScraper(driver, recycle_mb=256)
+    assert not search._needs_recycle(9)  # only every 10 scrolls
+    assert search._needs_recycle(10) and search._needs_recycle(20)
+    assert driver.cdp == ["Performance.enable", "Performance.getMetrics", "Performance.getMetrics"]
+    assert not SearchScraper(HeapFeed(200), recycle_mb=256)._needs_recycle(10)
@@ -0,0 +1,25 @@
+import csv, json, os
+from reparse import reparse
+from snapshot_store import SnapshotStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def test_reparse_uses_snapshot_time_and_counts_failures(tmp_path):
+    root = str(tmp_path / "snaps")
+    store = SnapshotStore(root)
+    with open(os.path.join(FIXTURES, "cards.html"), encoding="utf-8") as f:
+        digest = store.put("search", f.read(), url="https://x.com/search?q=%23genai")
+    # the snapshot was taken on 2024-01-12 00:00 UTC; one more manifest line has no object file
+    lines = [json.loads(l) for l in open(store.manifest, encoding="utf-8")]
+    lines[0]["time"] = 1705017600.0
+    lines.append({"hash": "0" * 64, "kind": "search", "url": None, "time": 1705017600.0})
+    with open(store.manifest, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(l) + "\n" for l in lines)
+
+    tweets_csv = str(tmp_path / "tweets.csv")
+    n_tweets, n_profiles, failed = reparse(root, tweets_csv, str(tmp_path / "profiles.csv"), workers=1)
+    assert (n_tweets, n_profiles, failed) == (2, 0, 1)
+    with open(tweets_csv, newline="", encoding="utf-8") as f:
+        assert {row["scrape_time"] for row in csv.DictReader(f)} == {"2024-01-12T00:00:00+0000"}
+    assert digest == lines[0]["hash"]
@@ -0,0 +1,80 @@
+import threading
+from datetime import date
+import pytest
+import session_pool
+from session_pool import SessionPool, SessionScheduler
+from utils import RateLimited
+from conftest import WindowFeed, QuickSearch
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+class FakeSearch:
+    """Five rows per window, like SearchScraper with a sink."""
+
+    def __init__(self, driver, **kwargs):
+        pass
+
+    def search_hashtag(self, hashtag, since=None, sink=None, **kwargs):
+        for i in range(5):
+            sink.write({"tweet_id": f"{since.isoformat()}-{i}"})
+        return []
+
+
+class LimitedSearch(FakeSearch):
+    calls = 0
+
+    def search_hashtag(self, *args, **kwargs):
+        LimitedSearch.calls += 1
+        raise RateLimited("rate_limit")
+
+
+def test_start_failure_is_retried_in_another_session(monkeypatch):
+    starts = []
+
+    def make_driver(*args, **kwargs):
+        starts.append(1)
+        if len(starts) == 1:
+            raise RuntimeError("chrome did not start")
+        return FakeDriver()
+
+    monkeypatch.setattr(session_pool, "make_driver", make_driver)
+    monkeypatch.setattr(session_pool, "SearchScraper", FakeSearch)
+    with SessionPool([None, None], cooldown=0.05) as pool:
+        scheduler = SessionScheduler(pool)
+        rows = scheduler.scrape("bench", date(2024, 1, 1), date(2024, 1, 5), shards=4)
+        assert not any(s.dead for s in pool.sessions)
+    assert len(rows) == 20
+    assert scheduler.missed == []
+
+
+def test_rate_limited_window_is_given_up(monkeypatch):
+    monkeypatch.setattr(session_pool, "make_driver", lambda *a, **k: FakeDriver())
+    monkeypatch.setattr(session_pool, "SearchScraper", LimitedSearch)
+    LimitedSearch.calls = 0
+    with SessionPool([None, None], cooldown=0.01, max_cooldown=0.02) as pool:
+        scheduler = SessionScheduler(pool, rate_limit_retries=3)
+        with pytest.raises(RuntimeError):
+            scheduler.scrape("bench", date(2024, 1, 1), date(2024, 1, 3), shards=2)
+    # each window: the first try and 3 more, then it is missed
+    assert LimitedSearch.calls == 8
+    assert len(scheduler.missed) == 2
+
+
+def test_windows_shorter_than_their_budget_end(monkeypatch):
+    # the real scroll loop: 4 windows of 2 tweets with limit 5, each window ends at its end
+    monkeypatch.setattr(session_pool, "make_driver", lambda *a, **k: WindowFeed())
+    monkeypatch.setattr(session_pool, "SearchScraper", QuickSearch)
+    result = []
+    with SessionPool([None, None], per_minute=60000) as pool:
+        scheduler = SessionScheduler(pool)
+        t = threading.Thread(target=lambda: result.append(
+            scheduler.scrape("bench", date(2024, 1, 1), date(2024, 1, 5), limit=5, shards=4)), daemon=True)
+        t.start()
+        t.join(20)
+        assert not t.is_alive(), "the scheduled scrape did not end"
+    assert len(result[0]) == 5
+    assert scheduler.missed == []
@@ -0,0 +1,81 @@
+import threading, time
+from datetime import date
+import pytest
+import sharded_scraper
+from sharded_scraper import ShardedScraper
+from conftest import WindowFeed, QuickSearch
+
+
+class FakeSearch:
+    """Writes 10 rows per window to the sink (as SearchScraper does), within the given limit.
+
+    One row every 10ms: a real window takes seconds, so the main thread keeps up with it."""
+    limits = []
+    lock = threading.Lock()
+
+    def __init__(self, driver, **kwargs):
+        pass
+
+    def search_hashtag(self, hashtag, limit=None, since=None, until=None, sink=None, stop=None, **kwargs):
+        with self.lock:
+            self.limits.append(limit)
+        if since.day == 13:
+            raise RuntimeError("page did not load")
+        for i in range(10):
+            if stop is not None and stop.is_set() or (limit and i >= limit):
+                break
+            time.sleep(0.01)
+            sink.write({"tweet_id": f"{since.isoformat()}-{i}"})
+        return []
+
+
+class BrokenSearch(FakeSearch):
+    def search_hashtag(self, *args, **kwargs):
+        raise RuntimeError("page did not load")
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(sharded_scraper, "make_driver", lambda *a, **k: type("D", (), {"quit": lambda s: None})())
+    monkeypatch.setattr(sharded_scraper.CookiesLoader, "load_cookies", staticmethod(lambda d, p: None))
+    FakeSearch.limits = []
+
+
+def test_rows_are_streamed_and_limited(offline, monkeypatch):
+    monkeypatch.setattr(sharded_scraper, "SearchScraper", FakeSearch)
+    rows = ShardedScraper(workers=2).scrape("bench", date(2024, 1, 1), date(2024, 1, 21), limit=25, shards=20)
+    assert len(rows) == 25
+    assert len({r["tweet_id"] for r in rows}) == 25
+    # windows only ask for what is still missing, and no new window starts after the limit
+    assert max(FakeSearch.limits) == 25 and min(FakeSearch.limits) < 25
+    assert len(FakeSearch.limits) < 20
+
+
+def test_failed_windows_are_retried_and_missed(offline, monkeypatch):
+    monkeypatch.setattr(sharded_scraper, "SearchScraper", FakeSearch)
+    scraper = ShardedScraper(workers=2)
+    rows = scraper.scrape("bench", date(2024, 1, 10), date(2024, 1, 15), shards=5)
+    assert len(rows) == 40  # 2024-01-13 failed, the 4 other windows give 10 rows each
+    assert FakeSearch.limits.count(None) == 6  # 5 windows, and one retry of 2024-01-13
+    assert scraper.missed == [(date(2024, 1, 13), date(2024, 1, 14))]
+
+
+def test_windows_shorter_than_their_budget_end(offline, monkeypatch):
+    # 4 windows of 2 tweets with limit 5: every window has less than it may take,
+    # it must end at the end of its timeline (not scroll on for the rest of its budget)
+    monkeypatch.setattr(sharded_scraper, "make_driver", lambda *a, **k: WindowFeed())
+    monkeypatch.setattr(sharded_scraper, "SearchScraper", QuickSearch)
+    result = []
+    t = threading.Thread(target=lambda: result.append(
+        ShardedScraper(workers=2).scrape("bench", date(2024, 1, 1), date(2024, 1, 5), limit=5, shards=4)), daemon=True)
+    t.start()
+    t.join(20)
+    assert not t.is_alive(), "the sharded scrape did not end"
+    rows = result[0]
+    assert len(rows) == 5 and len({r["tweet_id"] for r in rows}) == 5
+
+
+def test_no_window_scraped_raises(offline, monkeypatch):
+    monkeypatch.setattr(sharded_scraper, "SearchScraper", BrokenSearch)
+    with pytest.raises(RuntimeError):
+        ShardedScraper(workers=2).scrape("bench", date(2024, 1, 1), date(2024, 1, 5), shards=4)
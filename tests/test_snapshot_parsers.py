@@ -0,0 +1,50 @@
+import os
+from profile_scraper import ProfileScraper
+from search_scraper import SearchScraper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_cards_html():
+    # the third card (promoted, no status link) has no tweet to read
+    first, second = SearchScraper.parse_cards_html(fixture("cards.html"))
+    assert first["tweet_id"] == "1745000000000000001"
+    assert first["tweet_url"] == "https://x.com/alice/status/1745000000000000001"
+    assert first["profile_url"] == "https://x.com/alice"
+    assert first["post_time"] == "2024-01-10T08:15:00.000Z"
+    assert first["hashtags"] == "#genai;#ML"
+    assert (first["comments"], first["reposts"], first["likes"]) == (12, 3400, 1200)
+    # reply button without a number ("Reply" is how X shows 0), and no like button at all
+    assert (second["comments"], second["reposts"], second["likes"]) == (0, 2_000_000, None)
+
+
+def test_parse_profile_html():
+    prof = ProfileScraper.parse_html(fixture("profile.html"), "https://x.com/alice")
+    assert prof["username_handle"] == "alice"
+    assert prof["display_name"] == "Alice Example"
+    assert prof["user_id"] == "987654321"
+    assert prof["email"] == "alice@example.org"
+    assert prof["location"] == "Berlin"
+    assert prof["website_url"] == "https://example.org"
+    assert prof["account_creation_date"] == "March 2010"
+    assert prof["verification_status"] == "Verified"
+    assert prof["account_type"] == "Business/Professional"
+    assert (prof["followers_count"], prof["following_count"]) == (5600, 321)
+    assert (prof["tweet_count"], prof["media_count"]) == (12300, 45)
+    assert prof["profile_language"] == "en"
+
+
+def test_button_without_a_number_is_zero():
+    raws = [{"tweet_url": "https://x.com/a/status/1", "reply": "Reply", "retweet": "", "like": None},
+            {"tweet_url": "https://x.com/a/status/2", "reply": "12", "retweet": "3.4K", "like": "4.3B"}]
+    one_by_one = [SearchScraper._raw_to_dict(r) for r in raws]
+    column = SearchScraper.raws_to_records(raws)
+    for recs in (one_by_one, column):
+        assert (recs[0]["comments"], recs[0]["reposts"], recs[0]["likes"]) == (0, 0, None)
+        assert (recs[1]["comments"], recs[1]["reposts"]) == (12, 3400)
+    assert column[1]["likes"] is None  # too big for the UInt32 column, not 0
@@ -0,0 +1,27 @@
+from tweet_index import TweetIndex
+
+
+def test_mark_is_saved_only_by_finish(tmp_path):
+    db = str(tmp_path / "index.db")
+    with TweetIndex("genai", db) as index:
+        index.add("200")
+        index.add("150")
+    # the run did not finish (limit, error): the next run still has no mark
+    with TweetIndex("#GenAI", db) as index:
+        assert index.high_water is None
+        index.add("200")
+        index.finish()
+    with TweetIndex("genai", db) as index:
+        assert index.high_water == 200
+        assert index.is_old("199") and index.is_old(200)
+        assert not index.is_old("201")
+
+
+def test_fake_ids_are_never_old(tmp_path):
+    with TweetIndex("genai", str(tmp_path / "index.db")) as index:
+        index.add("5b0c0c9e-8a8e-4f39-9a0e-3f1d2f6b1c11")
+        index.add("100")
+        index.finish()
+    with TweetIndex("genai", str(tmp_path / "index.db")) as index:
+        assert index.high_water == 100
+        assert not index.is_old("5b0c0c9e-8a8e-4f39-9a0e-3f1d2f6b1c11")
@@ -0,0 +1,40 @@
+from csv_handler import CSVHandler
+from tweet_store import TweetStore
+
+
+def tweet(tweet_id, **fields):
+    return dict({"tweet_id": tweet_id, "user_handle": "alice", "post_time": "2024-01-10T08:15:00.000Z"}, **fields)
+
+
+def test_upsert_keeps_old_values_that_the_new_row_lacks(tmp_path):
+    with TweetStore(str(tmp_path / "tweets.db")) as store:
+        store.upsert_many([tweet("1", content="first try #genai", hashtags="#genai", likes="12", views="300")])
+        # scraped again later: more likes, but no view count this time
+        store.upsert_many([tweet("1", content="first try #genai", likes="15", views="")])
+        assert store.count() == 1
+        row = store.by_handle("@ALICE")[0]
+        assert (row["likes"], row["views"]) == (15, 300)
+        assert [r["tweet_id"] for r in store.by_hashtag("#GenAI")] == ["1"]
+
+
+def test_search_follows_updated_content(tmp_path):
+    with TweetStore(str(tmp_path / "tweets.db")) as store:
+        store.upsert_many([tweet("1", content="a quiet lighthouse"), tweet("2", content="noisy harbour")])
+        assert [r["tweet_id"] for r in store.search("lighthouse")] == ["1"]
+        store.upsert_many([tweet("1", content="a loud foghorn")])
+        assert store.search("lighthouse") == []
+        assert [r["tweet_id"] for r in store.search("foghorn")] == ["1"]
+        store.conn.execute("DELETE FROM tweets WHERE tweet_id = '2'")
+        assert store.search("harbour") == []
+
+
+def test_import_csv_twice_adds_nothing(tmp_path):
+    path = str(tmp_path / "tweets.csv")
+    CSVHandler.save_to_csv([tweet("1", content="one #genai", hashtags="#genai"),
+                            tweet("2", content="two #genai;#ml", hashtags="#genai;#ml")], path)
+    with TweetStore(str(tmp_path / "tweets.db")) as store:
+        assert store.import_csv(path) == 2
+        assert store.import_csv(path) == 2
+        assert store.count() == 2
+        assert sorted(r["tweet_id"] for r in store.by_hashtag("genai")) == ["1", "2"]
+        assert store.conn.execute("SELECT COUNT(*) FROM tweet_hashtags").fetchone()[0] == 3
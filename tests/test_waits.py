@@ -0,0 +1,25 @@
+import pytest
+from search_scraper import SearchScraper
+from conftest import StaticDriver
+
+
+class BlankDriver(StaticDriver):
+    """Every page stays blank: no tweets and no "no results" box."""
+
+    def find_elements(self, by, value):
+        return []
+
+
+def test_fast_scrolls_do_not_shorten_page_loads():
+    search = SearchScraper(StaticDriver())
+    for _ in range(20):
+        search.scroll_waiter._times.append(0.05)
+    assert search.scroll_waiter.timeout == search.scroll_waiter.min_timeout
+    assert search.page_waiter.timeout >= 5.0
+
+
+def test_search_page_that_does_not_load_is_an_error(standin):
+    search = SearchScraper(BlankDriver(), base_url=standin())
+    search.page_waiter.min_timeout = search.page_waiter.max_timeout = 0.2
+    with pytest.raises(RuntimeError):
+        search.search_hashtag("bench")
@@ -0,0 +1,59 @@
+import sqlite3, time
+
+
+class TweetIndex:
+    """The newest tweet ID already scraped for one hashtag, saved on disk (SQLite) between runs.
+
+    This "high-water mark" is all we need: X tweet IDs grow with time, so in the
+    live search (newest first) any tweet with an ID at or below the mark is from an
+    earlier run, and we can stop there. Fake IDs (gen_tweet_id, when a card has no
+    link) are never old: they are new in every run and can not be compared.
+
+    The new mark is saved by finish(), only when the search went all the way down
+    to the old mark (or to the end of the timeline). A run stopped by the limit,
+    an error or Ctrl+C keeps the old mark, so the tweets it did not reach are
+    scraped next time instead of being skipped for good.
+    """
+
+    def __init__(self, hashtag, path="tweet_index.db"):
+        self.hashtag = hashtag.lstrip("#").lower()
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS marks ("
+            " hashtag TEXT PRIMARY KEY, max_id INTEGER, updated_at REAL)"
+        )
+        self.conn.commit()
+        row = self.conn.execute("SELECT max_id FROM marks WHERE hashtag = ?", (self.hashtag,)).fetchone()
+        # the mark of the earlier runs (it does not move during this run)
+        self.high_water = row[0] if row else None
+        self._max_id = self.high_water
+
+    def is_old(self, tweet_id):
+        # True if this tweet was scraped in an earlier run
+        tid = str(tweet_id)
+        return self.high_water is not None and tid.isdigit() and int(tid) <= self.high_water
+
+    def add(self, tweet_id):
+        # a tweet of this run (only the biggest ID is kept, in memory until finish())
+        tid = str(tweet_id)
+        if tid.isdigit() and (self._max_id is None or int(tid) > self._max_id):
+            self._max_id = int(tid)
+
+    def finish(self):
+        # the run is complete down to the old mark: save the new mark
+        if self._max_id is None or self._max_id == self.high_water:
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO marks (hashtag, max_id, updated_at) VALUES (?, ?, ?)",
+                (self.hashtag, self._max_id, time.time()),
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,175 @@
+# tweet_store.py
+"""All scraped tweets in one SQLite database, with indexes and full-text search.
+
+    python tweet_store.py tweets.db import genai.csv ml.csv
+    python tweet_store.py tweets.db search "open source"
+    python tweet_store.py tweets.db handle elonmusk
+    python tweet_store.py tweets.db hashtag genai
+"""
+import argparse, csv, sqlite3, sys
+from csv_handler import COLUMNS, COUNT_COLUMNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    tweet_id TEXT PRIMARY KEY,
+    tweet_url TEXT, user_handle TEXT, profile_url TEXT,
+    content TEXT, hashtags TEXT, post_time TEXT, scrape_time TEXT,
+    likes INTEGER, comments INTEGER, reposts INTEGER, views INTEGER
+);
+CREATE INDEX IF NOT EXISTS tweets_user_handle ON tweets(user_handle COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tweets_post_time ON tweets(post_time);
+
+-- one row per (tweet, hashtag), so a hashtag lookup uses an index
+CREATE TABLE IF NOT EXISTS tweet_hashtags (
+    hashtag TEXT NOT NULL COLLATE NOCASE,
+    tweet_id TEXT NOT NULL,
+    PRIMARY KEY (hashtag, tweet_id)
+) WITHOUT ROWID;
+
+-- full-text index on content, kept in sync by the triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5(content, content='tweets', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS tweets_ai AFTER INSERT ON tweets BEGIN
+    INSERT INTO tweets_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS tweets_ad AFTER DELETE ON tweets BEGIN
+    INSERT INTO tweets_fts(tweets_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS tweets_au AFTER UPDATE OF content ON tweets BEGIN
+    INSERT INTO tweets_fts(tweets_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    INSERT INTO tweets_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+"""
+
+UPSERT = (
+    f"INSERT INTO tweets ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    "ON CONFLICT(tweet_id) DO UPDATE SET "
+    + ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in COLUMNS if c != "tweet_id")
+)
+
+
+def _int(value):
+    # "1200", "1200.0", 1200 -> 1200; empty -> None
+    if value is None or value == "":
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TweetStore:
+    """SQLite store for tweets: upsert by tweet_id, indexed lookups and FTS5 search."""
+
+    def __init__(self, path="tweets.db", batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _values(self, row):
+        return [_int(row.get(c)) if c in COUNT_COLUMNS else (row.get(c) or None) for c in COLUMNS]
+
+    def upsert_many(self, rows):
+        """Insert or update tweets, batch_size rows per transaction. Gives back how many rows."""
+        n, batch = 0, []
+        for row in rows:
+            if not row.get("tweet_id"):
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                n += self._write(batch)
+                batch = []
+        if batch:
+            n += self._write(batch)
+        return n
+
+    def _write(self, batch):
+        tags = [
+            (tag.lstrip("#"), row["tweet_id"])
+            for row in batch for tag in (row.get("hashtags") or "").split(";") if tag.strip("#")
+        ]
+        with self.conn:
+            self.conn.executemany(UPSERT, [self._values(r) for r in batch])
+            self.conn.executemany("INSERT OR IGNORE INTO tweet_hashtags (hashtag, tweet_id) VALUES (?, ?)", tags)
+        return len(batch)
+
+    def import_csv(self, filename):
+        # rows are read one by one, so a big CSV does not fill the memory
+        with open(filename, "r", newline="", encoding="utf-8") as f:
+            return self.upsert_many(csv.DictReader(f))
+
+    # --- queries ---
+
+    def search(self, text, limit=50):
+        # full-text search on content (FTS5 syntax: words, "phrases", OR, NOT, prefix*)
+        return self.conn.execute(
+            "SELECT t.* FROM tweets_fts JOIN tweets t ON t.rowid = tweets_fts.rowid "
+            "WHERE tweets_fts MATCH ? ORDER BY rank LIMIT ?", (text, limit)
+        ).fetchall()
+
+    def by_handle(self, handle, limit=50):
+        return self.conn.execute(
+            "SELECT * FROM tweets WHERE user_handle = ? COLLATE NOCASE ORDER BY post_time DESC LIMIT ?",
+            (handle.lstrip("@"), limit)
+        ).fetchall()
+
+    def by_hashtag(self, hashtag, limit=50):
+        return self.conn.execute(
+            "SELECT t.* FROM tweet_hashtags h JOIN tweets t ON t.tweet_id = h.tweet_id "
+            "WHERE h.hashtag = ? ORDER BY t.post_time DESC LIMIT ?", (hashtag.lstrip("#"), limit)
+        ).fetchall()
+
+    def between(self, start, end, limit=50):
+        # post_time is ISO text, so text order is time order
+        return self.conn.execute(
+            "SELECT * FROM tweets WHERE post_time >= ? AND post_time < ? ORDER BY post_time LIMIT ?",
+            (start, end, limit)
+        ).fetchall()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store for scraped tweets (import and fast lookups).")
+    parser.add_argument("db", help="Database file, e.g. tweets.db")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help="Add (or update) tweets from CSV files")
+    p.add_argument("files", nargs="+")
+    for name, helptext in [("search", "Full-text search on content"),
+                           ("handle", "Tweets of one user handle"),
+                           ("hashtag", "Tweets with one hashtag")]:
+        p = sub.add_parser(name, help=helptext)
+        p.add_argument("query")
+        p.add_argument("-n", "--limit", type=int, default=50, help="Max rows (default: 50)")
+    args = parser.parse_args()
+
+    with TweetStore(args.db) as store:
+        if args.cmd == "import":
+            for f in args.files:
+                print(f"[OK] {f}: {store.import_csv(f)} rows")
+            print(f"[OK] {store.count()} tweets in {args.db}")
+            return
+        rows = {"search": store.search, "handle": store.by_handle, "hashtag": store.by_hashtag}[args.cmd](
+            args.query, args.limit
+        )
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["tweet_id", "post_time", "user_handle", "content"])
+        for r in rows:
+            writer.writerow([r["tweet_id"], r["post_time"], r["user_handle"], r["content"]])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import re, time, uuid, math
+from collections import deque
 from datetime import datetime, timezone
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from metrics import metrics
+from records import parse_count
 
 # This is how we want to show date and time (in a standard format).
 ISO = "%Y-%m-%dT%H:%M:%S%z"
@@ -10,26 +15,103 @@ def now_iso():
     # Give me the current time in ISO format (like "2025-08-25T13:45:00+0000")
     return datetime.now(timezone.utc).strftime(ISO)
 
-def parse_int_maybe(text: str):
-    """Turn text like '12,345' or '1.2K' or '3.4M' into a number. If not possible, give None."""
-    if not text: return None
-    t = text.replace(",", "").strip().upper()
+# the same count parser everywhere (tweets and profiles), see records.py
+parse_int_maybe = parse_count
+
+def short_wait(driver, seconds=10, poll=0.5):
+    # Wait for something on the page for a few seconds (checks every `poll` seconds)
+    return WebDriverWait(driver, seconds, poll_frequency=poll)
+
+
+class AdaptiveWait:
+    """Wait for a condition on the page, with a timeout that follows the real speed.
+
+    It remembers how long the last waits took and uses a few times the slow ones
+    (90th percentile) as the next timeout, between `min_timeout` and `max_timeout`.
+    On a fast connection we go on as soon as the page is ready, on a slow one we
+    wait longer before saying "nothing came".
+    """
+
+    def __init__(self, min_timeout=2.0, max_timeout=15.0, factor=3.0, history=20):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self._times = deque(maxlen=history)  # how long the successful waits took
+
+    @property
+    def timeout(self):
+        if not self._times:
+            return self.max_timeout
+        slow = sorted(self._times)[int(0.9 * (len(self._times) - 1))]
+        return min(self.max_timeout, max(self.min_timeout, slow * self.factor))
+
+    def until(self, driver, condition, timeout=None):
+        # True if the condition came true, False on timeout (no exception)
+        start = time.monotonic()
+        try:
+            short_wait(driver, timeout or self.timeout, poll=0.1).until(condition)
+        except TimeoutException:
+            metrics.add_time("wait", time.monotonic() - start)
+            metrics.incr("wait.timeouts")
+            return False
+        self._times.append(time.monotonic() - start)
+        metrics.add_time("wait", self._times[-1])
+        return True
+
+
+def page_load_wait():
+    # AdaptiveWait for whole page loads: they are slower than a scroll, and a timeout
+    # there means "no answer", so the timeout never goes below a few seconds
+    return AdaptiveWait(min_timeout=5.0, max_timeout=30.0)
+
+
+# What a page looks like when X stops giving tweets to this account:
+# "rate_limit" for the rate-limit / "something went wrong" pages, "login_wall" when we
+# are sent to the login page (cookies expired or the session was logged out).
+BLOCK_JS = """
+if (/^\\/(i\\/flow\\/)?login/.test(location.pathname)) return 'login_wall';
+if (document.querySelector('input[name="session[username_or_email]"], input[autocomplete="username"]')) return 'login_wall';
+const text = document.body ? document.body.innerText : '';
+if (/rate limit exceeded|over the daily limit|too many requests|something went wrong\\. try reloading/i.test(text)) return 'rate_limit';
+return null;
+"""
+
+
+class RateLimited(Exception):
+    """The page shows a rate-limit or login wall instead of tweets.
+
+    `kind` is "rate_limit" or "login_wall". `partial` has the tweets scraped before
+    (empty with a sink, they are already written), `oldest_id` is the oldest tweet ID
+    so far, to go on later from there (max_id).
+    """
+
+    def __init__(self, kind, partial=None, oldest_id=None):
+        super().__init__(f"search blocked: {kind}")
+        self.kind = kind
+        self.partial = partial if partial is not None else []
+        self.oldest_id = oldest_id
+
+
+def page_block(driver):
+    # "rate_limit", "login_wall" or None (a normal page)
     try:
-        if t.endswith("K"):  # Example: 1.2K, 1200
-            return int(float(t[:-1]) * 1_000)
-        if t.endswith("M"):  # Example: 3.4M, 3,400,000
-            return int(float(t[:-1]) * 1_000_000)
-        if t.endswith("B"):  # Example: 2B, 2,000,000,000
-            return int(float(t[:-1]) * 1_000_000_000)
-        # Remove anything that is not a digit and make it an int (number)
-        return int(re.sub(r"[^\d]", "", t) or 0)
-    except:
-        # If something goes wrong, return None
+        return driver.execute_script(BLOCK_JS)
+    except Exception:
         return None
 
-def short_wait(driver, seconds=10):
-    # Wait for something on the page for a few seconds
-    return WebDriverWait(driver, seconds)
+
+def page_height(driver):
+    return driver.execute_script("return document.body.scrollHeight")
+
+
+def height_grows(last):
+    # condition: the page got taller than `last` (new content loaded)
+    return lambda d: page_height(d) > last
+
+
+def element_present(xpath):
+    # condition: at least one element matches the xpath
+    return lambda d: len(d.find_elements(By.XPATH, xpath)) > 0
 
 def safe_text(el):
     # Try to get the text from an element. If it fails, return None.
@@ -50,15 +132,20 @@ def gen_tweet_id():
     # Make a random unique ID for a tweet (not real Twitter ID, just ours).
     return str(uuid.uuid4())
 
-def scroll_to_bottom(driver, step_pause=1.5, max_idle=6):
-    """Keep scrolling down until the page stops growing taller after some tries."""
+def scroll_to_bottom(driver, step_pause=1.5, max_idle=6, waiter=None):
+    """Keep scrolling down until the page stops growing taller after some tries.
+
+    After each scroll we wait until the page grows (not a fixed sleep);
+    `step_pause` is the shortest time we wait before counting a scroll as idle.
+    """
+    waiter = waiter or AdaptiveWait(min_timeout=step_pause)
     last = 0   # Last page height we saw
     idle = 0   # How many times the page didn't grow
     while True:
         # Scroll down by full page height
         driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
-        time.sleep(step_pause)  # Wait a bit so page can load new stuff
-        h = driver.execute_script("return document.body.scrollHeight")  # New page height
+        waiter.until(driver, height_grows(last))  # Wait until the page loads new stuff
+        h = page_height(driver)  # New page height
         if h == last:
             # Page didn't grow taller → count it as idle
             idle += 1